@@ -0,0 +1,182 @@
+import time
+T0 = time.perf_counter()
+import os
+import sys
+import numpy as np
+from predicates import U, concurrent, compare_x
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.pointio import read_points
+from common.cli import pop_flags
+from common.timing import PhaseTimer
+from dual import dual_lines
+
+# Linear-memory sweep of the whole dual arrangement.
+#
+# Far to the left the dual lines are ordered bottom to top by decreasing
+# slope. Only lines that are adjacent in the current order can meet next, so
+# each line keeps at most one pending vertex: the one with the line just above
+# it. Those pending vertices sit in an indexed heap keyed by the lower line,
+# which keeps memory at O(n) instead of the Θ(n²) vertex sets of SweepLine.
+# At a vertex the lines through it form one contiguous block of the order;
+# reversing the block moves the sweep past the vertex and only the two new
+# outer pairs need to be scheduled. Parallel lines (vertical primal lines)
+# never meet, as in the other engines.
+
+class VertexHeap:
+    # Binary heap of line ids; line i stands for its vertex with above[i].
+    # slot[i] is the heap position of i, or -1 while it has no vertex.
+    def __init__(self, lines, above):
+        self.lines = lines
+        self.above = above
+        self.heap = []
+        self.x = {}
+        self.slot = [-1] * len(lines)
+
+    def _less(self, i, j):
+        xi, xj = self.x[i], self.x[j]
+        # A float vertex x is within 3u|x| of the true one
+        if abs(xi - xj) > 8 * U * max(abs(xi), abs(xj)):
+            return xi < xj
+        li, lj = self.lines[i], self.lines[j]
+        return compare_x(li, self.lines[self.above[i]], lj, self.lines[self.above[j]]) < 0
+
+    def _place(self, k, i):
+        self.heap[k] = i
+        self.slot[i] = k
+
+    def _up(self, k):
+        i = self.heap[k]
+        while k > 0:
+            p = (k - 1) // 2
+            if not self._less(i, self.heap[p]):
+                break
+            self._place(k, self.heap[p])
+            k = p
+        self._place(k, i)
+
+    def _down(self, k):
+        i = self.heap[k]
+        n = len(self.heap)
+        while 2 * k + 1 < n:
+            c = 2 * k + 1
+            if c + 1 < n and self._less(self.heap[c + 1], self.heap[c]):
+                c += 1
+            if not self._less(self.heap[c], i):
+                break
+            self._place(k, self.heap[c])
+            k = c
+        self._place(k, i)
+
+    def push(self, i, x):
+        self.x[i] = x
+        self.heap.append(i)
+        self._up(len(self.heap) - 1)
+
+    def remove(self, i):
+        k = self.slot[i]
+        if k < 0:
+            return
+        self.slot[i] = -1
+        del self.x[i]
+        last = self.heap.pop()
+        if last != i:
+            self._place(k, last)
+            self._down(k)
+            self._up(self.slot[last])
+
+    def pop(self):
+        i = self.heap[0]
+        self.remove(i)
+        return i
+
+class ArrangementSweep:
+    # report(best) is called with the sorted ids of the lines through each
+    # vertex that has more lines than any vertex before it
+    def __init__(self, lines, report=None):
+        self.lines = [tuple(l) for l in np.asarray(lines, dtype=np.float64).tolist()]
+        n = len(self.lines)
+        self.order = sorted(range(n), key=lambda i: (-self.lines[i][0], self.lines[i][1], i))
+        self.where = [0] * n
+        for k, i in enumerate(self.order):
+            self.where[i] = k
+        self.above = [-1] * n
+        self.events = VertexHeap(self.lines, self.above)
+        self.report = report
+        self.best = []
+        for k in range(n - 1):
+            self.schedule(k)
+
+    # Schedules the vertex of the lines at positions k and k+1 if they still meet
+    def schedule(self, k):
+        lo, hi = self.order[k], self.order[k + 1]
+        self.events.remove(lo)
+        (a1, b1), (a2, b2) = self.lines[lo], self.lines[hi]
+        if a1 > a2:
+            self.above[lo] = hi
+            self.events.push(lo, (b2 - b1) / (a1 - a2))
+
+    def step(self):
+        i = self.events.pop()
+        l1, l2 = self.lines[i], self.lines[self.above[i]]
+        lo = hi = self.where[i]
+        hi += 1
+        while lo > 0 and concurrent(l1, l2, self.lines[self.order[lo - 1]]):
+            lo -= 1
+        while hi + 1 < len(self.order) and concurrent(l1, l2, self.lines[self.order[hi + 1]]):
+            hi += 1
+
+        block = self.order[lo:hi + 1]
+        block.reverse()
+        self.order[lo:hi + 1] = block
+        for k in range(lo, hi + 1):
+            self.where[block[k - lo]] = k
+            self.events.remove(block[k - lo])
+        if lo > 0:
+            self.schedule(lo - 1)
+        if hi + 1 < len(self.order):
+            self.schedule(hi)
+
+        # Ties go to the smaller sorted index list, as in main.py
+        if len(block) > len(self.best):
+            self.best = sorted(block)
+            if self.report:
+                self.report(self.best)
+        elif len(block) == len(self.best) and sorted(block) < self.best:
+            self.best = sorted(block)
+
+    def run(self):
+        while self.events.heap:
+            self.step()
+        return self.best
+
+# Max collinear subset of an (n, 2) point array using O(n) working memory.
+# Returns the sorted indices of the points on the common line.
+def max_collinear(points, report=None):
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    return np.array(ArrangementSweep(dual_lines(points), report).run(), dtype=np.intp)
+
+if __name__ == "__main__":
+    flags = pop_flags(sys.argv, '--timing', '--progress')
+    timer = PhaseTimer(T0)
+    timer.mark('startup')
+    if len(sys.argv) != 2:
+        print("Usage: python3 arrangement.py [--timing] [--progress] <points file>")
+        sys.exit(1)
+
+    points = read_points(sys.argv[1])
+    timer.mark('read')
+    report = None
+    if '--progress' in flags:
+        report = lambda best: print(f"vertex with {len(best)} lines", file=sys.stderr)
+    best = max_collinear(points, report)
+    timer.mark('compute')
+
+    if len(best):
+        print("Largest subset of points that lie on a common line ::")
+        for x, y in points[best].tolist():
+            print(f"{x}, {y}")
+    else:
+        print("No segment intersections found.")
+    timer.mark('output')
+    if '--timing' in flags:
+        timer.report()
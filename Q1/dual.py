@@ -1,98 +1,119 @@
-import matplotlib.pyplot as plt
-from shapely.geometry import LineString, box
+import time
+T0 = time.perf_counter()
 import numpy as np
+import os
 import sys
 import re
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.pointio import read_points
+from common.cli import pop_flags
+from common.timing import PhaseTimer
+from common.cache import ResultCache
 
 def dual_line(pt):
     a, b = pt
     return (a, -b)  # y = ax + b'
 
-def intersection(l1, l2):
-    a1, b1 = l1
-    a2, b2 = l2
-    if a1 == a2:
-        return None
-    x = (b2 - b1) / (a1 - a2)
-    y = a1 * x + b1
-    return (x, y)
-
-def merge_envelopes(env1, env2, is_upper=True):
-    merged = []
-    i = j = 0
-    while i < len(env1) and j < len(env2):
-        if (is_upper and env1[i][0] < env2[j][0]) or (not is_upper and env1[i][0] > env2[j][0]):
-            merged.append(env1[i])
-            i += 1
-        else:
-            merged.append(env2[j])
-            j += 1
-    merged.extend(env1[i:])
-    merged.extend(env2[j:])
-    return merged
-
-def compute_envelope(lines, is_upper=True):
-    if len(lines) == 1:
-        return [lines[0]]
-    mid = len(lines) // 2
-    left = compute_envelope(lines[:mid], is_upper)
-    right = compute_envelope(lines[mid:], is_upper)
-    return merge_envelopes(left, right, is_upper)
-
-def compute_envelope_intersections(env):
-    intersections = []
-    for i in range(len(env) - 1):
-        inter = intersection(env[i], env[i + 1])
-        if inter:
-            intersections.append(inter)
-    return intersections
-
-def clip_line(a, b, bbox):
+# Array versions of the steps in main(), so the pipeline can pass data along
+# in memory. duals is an (n, 2) array of (slope, intercept) rows.
+def dual_lines(points):
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    return np.column_stack((points[:, 0], -points[:, 1]))
+
+# Crossings of lines from neighbouring groups of equal slope, for lines
+# y = a x + b ordered so that equal slopes are adjacent. Only the lowest and
+# highest intercept of each group can give an extreme crossing, so each pair
+# of neighbouring groups contributes four points. Returns their xs and ys.
+def _neighbour_crossings(a, b):
+    start = np.flatnonzero(np.r_[True, a[1:] != a[:-1]])
+    if len(start) < 2:
+        return np.empty(0), np.empty(0)
+    lo, hi = np.minimum.reduceat(b, start), np.maximum.reduceat(b, start)
+    a1, a2 = a[start[:-1]], a[start[1:]]
+    xs, ys = [], []
+    for b1 in (lo[:-1], hi[:-1]):
+        for b2 in (lo[1:], hi[1:]):
+            xs.append((b2 - b1) / (a1 - a2))
+            ys.append((a1 * b2 - a2 * b1) / (a1 - a2))
+    return np.concatenate(xs), np.concatenate(ys)
+
+# Box holding every vertex of the arrangement, padded by 1, or None if no two
+# lines meet. Left of its leftmost vertex the lines are ordered by slope, and
+# the two lines crossing there are neighbours in that order, so the x range
+# comes from neighbouring slope groups. Read as x = y/a - b/a, the
+# non-horizontal lines give the y range the same way, ordered by 1/a; a
+# horizontal line y = b meets every other line at height b. O(n log n).
+def bounding_box(duals):
+    a, b = duals[:, 0], duals[:, 1]
+    order = np.lexsort((b, a))
+    xs, _ = _neighbour_crossings(a[order], b[order])
+    if not len(xs):
+        return None  # no two lines meet
+
+    steep = np.flatnonzero(a != 0)
+    order = steep[np.lexsort((-a[steep], a[steep] > 0))]  # ascending 1/a
+    _, ys = _neighbour_crossings(a[order], b[order])
+    flat = b[a == 0]
+    if len(flat):
+        ys = np.r_[ys, flat.min(), flat.max()]
+
+    # The padding also absorbs rounding in the crossings of large inputs
+    pad_x = max(1.0, 1e-9 * np.abs(xs).max())
+    pad_y = max(1.0, 1e-9 * np.abs(ys).max())
+    return (xs.min() - pad_x, xs.max() + pad_x, ys.min() - pad_y, ys.max() + pad_y)
+
+# Clips every line to bbox (Liang-Barsky on x). Returns an (m, 4) array of
+# x1 y1 x2 y2 rows and the index of the line each row came from; lines that
+# miss the box, or only touch it, are left out.
+def clip_lines(duals, bbox):
     min_x, max_x, min_y, max_y = bbox
-    line = LineString([(min_x, a * min_x + b), (max_x, a * max_x + b)])
-    clipped = line.intersection(box(min_x, min_y, max_x, max_y))
-    return clipped if not clipped.is_empty else None
+    a, b = duals[:, 0], duals[:, 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        enter = np.where(a > 0, (min_y - b) / a, (max_y - b) / a)
+        leave = np.where(a > 0, (max_y - b) / a, (min_y - b) / a)
+    flat = a == 0
+    inside = (b >= min_y) & (b <= max_y)
+    x1 = np.where(flat, min_x, np.maximum(min_x, enter))
+    x2 = np.where(flat, max_x, np.minimum(max_x, leave))
+    index = np.flatnonzero(np.where(flat, inside, x1 < x2))
+    a, b, x1, x2 = a[index], b[index], x1[index], x2[index]
+    y1 = np.clip(a * x1 + b, min_y, max_y)
+    y2 = np.clip(a * x2 + b, min_y, max_y)
+    return np.column_stack((x1, y1, x2, y2)) + 0.0, index  # no -0.0 in segs files
 
 def main():
+    flags = pop_flags(sys.argv, '--timing', '--cache')
+    timer = PhaseTimer(T0)
+    timer.mark('startup')
     filename = sys.argv[1]  # e.g., 'test1.txt'
     match = re.search(r'\d+', filename)
     i = match.group() if match else "0"
 
-    with open(filename, 'r') as f:
-        lines = f.read().strip().split('\n')
-
-    n = int(lines[0])
-    points = [tuple(map(float, line.strip().split())) for line in lines[1:n+1]]
-
-    duals = [dual_line(p) for p in points]
-    duals_sorted = sorted(duals)
-
-    upper_env = compute_envelope(duals_sorted, is_upper=True)
-    lower_env = compute_envelope(duals_sorted, is_upper=False)
-
-    upper_pts = compute_envelope_intersections(upper_env)
-    lower_pts = compute_envelope_intersections(lower_env)
-
-    all_pts = upper_pts + lower_pts
-    xs, ys = zip(*all_pts)
-    min_x, max_x = min(xs)-1, max(xs)+1
-    min_y, max_y = min(ys)-1, max(ys)+1
-    bbox = (min_x, max_x, min_y, max_y)
+    points = read_points(filename)
+    timer.mark('read')
 
     # Clip and store segments
-    segments = []
-    for idx, (a, b) in enumerate(duals):
-        seg = clip_line(a, b, bbox)
-        if seg and isinstance(seg, LineString):
-            coords = list(seg.coords)
-            if len(coords) == 2:
-                segments.append((coords[0], coords[1], idx))
+    def clip():
+        duals = dual_lines(points)
+        bbox = bounding_box(duals)
+        if bbox is None:
+            return {'segments': np.empty((0, 4))}
+        segments, _ = clip_lines(duals, bbox)
+        return {'segments': segments}
+    if '--cache' in flags:
+        segments = ResultCache().cached(points, 'dual.clip_lines', clip)['segments']
+    else:
+        segments = clip()['segments']
+    timer.mark('dualise/clip')
 
     # Write segments to file
     with open(f"segs{i}.txt", 'w') as f:
         f.write(f"{len(segments)}\n")
-        for (x1, y1), (x2, y2), _ in segments:
+        for x1, y1, x2, y2 in segments.tolist():
             f.write(f"{x1:.6f} {y1:.6f} {x2:.6f} {y2:.6f}\n")
+    timer.mark('write')
+    if '--timing' in flags:
+        timer.report()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
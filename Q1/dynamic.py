@@ -0,0 +1,107 @@
+from collections import defaultdict
+from predicates import VertexTable
+
+# Max collinear subset of a point set that changes by inserts and deletes.
+#
+# This is the slope-bucket table of main.find_intersections_and_collinear
+# kept up to date: every line through two distinct stored points is a bucket,
+# keyed by its dual vertex through a VertexTable, so rounding never splits or
+# merges lines. Inserting or deleting a point only touches the buckets through
+# it, O(n) of them. Buckets are also grouped by weight (points on the line,
+# copies included), which makes the largest line an O(1) lookup. Vertical
+# lines are not tracked, as in the other engines.
+
+class DynamicCollinear:
+    def __init__(self, points=()):
+        self.vertices = VertexTable()
+        self.count = {}                   # point -> copies stored
+        self.lines_of = {}                # point -> keys of the lines through it
+        self.lines = {}                   # key -> distinct points on the line
+        self.weight = {}                  # key -> points on the line, copies included
+        self.by_weight = defaultdict(set)
+        self.top = 0
+        for p in points:
+            self.insert(p)
+
+    def __len__(self):
+        return sum(self.count.values())
+
+    @staticmethod
+    def _point(point):
+        x, y = point
+        return (float(x) + 0.0, float(y) + 0.0)
+
+    def _reweigh(self, key, w):
+        old = self.weight.get(key)
+        if old is not None:
+            self.by_weight[old].discard(key)
+            if not self.by_weight[old]:
+                del self.by_weight[old]
+        if w is None:
+            del self.weight[key]
+        else:
+            self.weight[key] = w
+            self.by_weight[w].add(key)
+            self.top = max(self.top, w)
+        while self.top > 0 and self.top not in self.by_weight:
+            self.top -= 1
+
+    def insert(self, point):
+        p = self._point(point)
+        if p in self.count:
+            # Another copy joins every line the point is already on
+            self.count[p] += 1
+            for key in self.lines_of[p]:
+                self._reweigh(key, self.weight[key] + 1)
+            return
+
+        self.count[p] = 1
+        self.lines_of[p] = set()
+        lp = (p[0], -p[1])
+        for q in self.count:
+            if q[0] == p[0]:
+                continue  # same x: vertical line, or p itself
+            key = self.vertices.lookup(lp, (q[0], -q[1]))
+            line = self.lines.get(key)
+            if line is None:
+                line = self.lines[key] = {q}
+                self.lines_of[q].add(key)
+                self._reweigh(key, self.count[q])
+            if p not in line:
+                line.add(p)
+                self.lines_of[p].add(key)
+                self._reweigh(key, self.weight[key] + 1)
+
+    # Removes one copy of point; KeyError if it is not stored
+    def delete(self, point):
+        p = self._point(point)
+        if self.count[p] > 1:
+            self.count[p] -= 1
+            for key in self.lines_of[p]:
+                self._reweigh(key, self.weight[key] - 1)
+            return
+
+        del self.count[p]
+        for key in self.lines_of.pop(p):
+            line = self.lines[key]
+            line.discard(p)
+            if len(line) > 1:
+                self._reweigh(key, self.weight[key] - 1)
+                continue
+            # One point left is no longer a line
+            for q in line:
+                self.lines_of[q].discard(key)
+            del self.lines[key]
+            self.vertices.discard(key)
+            self._reweigh(key, None)
+
+    # Size of the largest line, copies included; 0 if there is none
+    def max_size(self):
+        return self.top
+
+    # Points of one largest line, each copy listed; [] if there is none
+    def max_collinear(self):
+        if not self.top:
+            return []
+        key = next(iter(self.by_weight[self.top]))
+        return [q for q in sorted(self.lines[key]) for _ in range(self.count[q])]
@@ -1,122 +1,372 @@
+import time
+T0 = time.perf_counter()
+import os
 import sys
-import matplotlib.pyplot as plt
+import heapq
 import itertools
 from collections import defaultdict
 import numpy as np
-import matplotlib.cm as cm
+from fractions import Fraction
+from predicates import U, VertexTable, orient_many
 import warnings
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.pointio import read_points
+from common.cli import pop_flags, pop_option
+from common.timing import PhaseTimer
+from common.plotting import LABEL_LIMIT, palette, add_lines, add_points
+from common.cache import ResultCache
 warnings.filterwarnings("ignore")
 
-def read_points(file_path):
-    points = []
-    with open(file_path, 'r') as f:
-        for i, line in enumerate(f, 1):
-            parts = line.strip().split()
-            if len(parts) != 2:
-                # print(f"Warning: Skipping invalid line {i}: {line.strip()}")
-                continue
-            try:
-                x, y = map(float, parts)
-                points.append((x, y))
-            except ValueError:
-                print(f"Warning: Could not convert line {i} to float: {line.strip()}")
-    return points
-
 def dual_line(point):
     x, y = point
     # Dual of point (a,b) is line y = ax - b
     return (x, -y)  # Represented as slope and intercept
 
-def find_intersections_and_collinear(pts):
-    duals = [dual_line(pt) for pt in pts]
+def dual_intersections(duals):
     intersection_dict = defaultdict(set)
+    vertices = VertexTable()
 
     for (i1, (a1, b1)), (i2, (a2, b2)) in itertools.combinations(enumerate(duals), 2):
         if a1 == a2:
             continue  # parallel lines, no intersection
-        x_int = (b2 - b1) / (a1 - a2)
-        y_int = a1 * x_int + b1
-        key = (round(x_int, 8), round(y_int, 8))
+        key = vertices.lookup((a1, b1), (a2, b2))
         intersection_dict[key].add(i1)
         intersection_dict[key].add(i2)
 
+    return intersection_dict
+
+def find_intersections_and_collinear(pts):
+    duals = [dual_line(pt) for pt in pts]
+    intersection_dict = dual_intersections(duals)
+
     max_collinear = max(intersection_dict.values(), key=len, default=set())
     collinear_points = [pts[i] for i in max_collinear]
 
     return collinear_points, duals, intersection_dict
 
+# Integer inputs below this bound take the exact int64 path of anchor_runs:
+# differences stay under 2**31, so cross products fit in an int64 and a
+# reduced direction packs into one
+INT_LIMIT = 1 << 30
+
+# pts as an int64 array if every coordinate is an integer with absolute value
+# below INT_LIMIT, else None
+def integer_points(pts):
+    pts = np.asarray(pts, dtype=np.float64).reshape(-1, 2)
+    if np.all(np.abs(pts) < INT_LIMIT) and np.all(np.trunc(pts) == pts):
+        return pts.astype(np.int64)
+    return None
+
+# Lines through pts[i] and the points after it.
+# Dual lines of pts[i] and pts[j] meet at x = slope of (pts[i], pts[j]),
+# so the dual vertices on line i are just the slope keys from the anchor.
+# Returns (dups, idx, order, starts, counts): line r holds pts[i], the copies
+# of it in dups and idx[order[starts[r]:starts[r] + counts[r]]]; None if no
+# point after i gives a non-vertical line. pts from integer_points take the
+# exact int64 path of integer_runs.
+def anchor_runs(pts, i):
+    d = pts[i + 1:] - pts[i]
+    keep = d[:, 0] != 0  # same x means parallel dual lines, no vertex
+    idx = np.flatnonzero(keep) + i + 1
+    # Copies of the anchor have the same dual line, so they join every vertex on it
+    dups = np.flatnonzero(~keep & (d[:, 1] == 0)) + i + 1
+    if len(idx) == 0:
+        return None
+    if pts.dtype.kind == 'i':
+        return (dups, idx) + integer_runs(d[keep])
+
+    slopes = d[keep, 1] / d[keep, 0]
+    order = np.argsort(slopes, kind='stable')
+    s = slopes[order]
+
+    # A slope from rounded differences is within 3u of the true one, so only
+    # neighbours closer than that can share a line. Those are confirmed with
+    # the exact orientation test; a chain of near slopes that mixes lines is
+    # re-sorted by exact slope before it is split.
+    near = np.abs(s[1:] - s[:-1]) <= 8 * U * np.maximum(np.abs(s[1:]), np.abs(s[:-1]))
+    k = np.flatnonzero(near)
+    q = pts[idx[order]]
+    same = np.zeros(len(s) - 1, dtype=bool)
+    same[k] = orient_many(q[k], q[k + 1], pts[i]) == 0
+    if not np.array_equal(same, near):
+        order, same = exact_slope_runs(pts, i, idx, order, near)
+    starts = np.flatnonzero(np.r_[True, ~same])
+    counts = np.diff(np.r_[starts, len(s)])
+    return dups, idx, order, starts, counts
+
+# Runs of equal direction among the (m, 2) int64 differences d, all with
+# d[:, 0] != 0, as (order, starts, counts). Only the runs matter, so no sort
+# here is stable.
+#
+# dy / dx of integers below 2**31 is the correctly rounded slope, so equal
+# directions always get equal floats. The runs of equal floats are taken as
+# the lines once every neighbouring pair in them passes the exact int64 test
+# dy1 * dx2 == dy2 * dx1. Only if two different directions round to the same
+# float does the anchor fall back to sorting gcd-reduced keys with dx > 0.
+def integer_runs(d):
+    dx, dy = d[:, 0], d[:, 1]
+    slopes = dy / dx
+    order = np.argsort(slopes)
+    s = slopes[order]
+    same = s[1:] == s[:-1]
+    k = np.flatnonzero(same)
+    a, b = order[k], order[k + 1]
+    if not np.array_equal(dy[a] * dx[b], dy[b] * dx[a]):
+        g = np.gcd(dx, dy)
+        np.negative(g, out=g, where=dx < 0)
+        key = ((dx // g) << 32) + (dy // g) + (1 << 31)
+        order = np.argsort(key)
+        key = key[order]
+        same = key[1:] == key[:-1]
+    starts = np.flatnonzero(np.r_[True, ~same])
+    counts = np.diff(np.r_[starts, len(order)])
+    return order, starts, counts
+
+# Largest line through pts[i] using only the points after it
+def anchor_best_line(pts, i):
+    runs = anchor_runs(pts, i)
+    if runs is None:
+        return np.empty(0, dtype=np.intp)
+    dups, idx, order, starts, counts = runs
+
+    # Same tie-break as the dict version: the line whose first pair comes first
+    # (the smallest index in the run, which need not be its first entry)
+    big = np.flatnonzero(counts == counts.max())
+    if len(big) > 1:
+        big = big[np.argmin(np.minimum.reduceat(order, starts)[big])]
+    else:
+        big = big[0]
+    run = order[starts[big]:starts[big] + counts[big]]
+    return np.r_[i, dups, idx[run]]
+
+# Slow path for anchor_best_line: chains of near-equal float slopes that hold
+# more than one line are re-sorted by exact rational slope
+def exact_slope_runs(pts, i, idx, order, near):
+    order = order.copy()
+    bounds = np.flatnonzero(np.r_[True, ~near, True])
+    xi, yi = Fraction(pts[i, 0]), Fraction(pts[i, 1])
+
+    def exact_slope(k):
+        x, y = pts[idx[k]]
+        return (Fraction(y) - yi) / (Fraction(x) - xi)
+
+    same = np.zeros(len(near), dtype=bool)
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        if hi - lo < 2:
+            continue
+        slopes = sorted((exact_slope(k), k) for k in order[lo:hi])
+        order[lo:hi] = [k for _, k in slopes]
+        same[lo:hi - 1] = [a[0] == b[0] for a, b in zip(slopes, slopes[1:])]
+    return order, same
+
+# NumPy engine: one anchor at a time, O(n) working memory per anchor.
+# Integer inputs run on exact int64 direction keys, without the float check.
+def find_max_collinear(pts):
+    pts = np.asarray(pts, dtype=np.float64).reshape(-1, 2)
+    n = len(pts)
+    best = np.empty(0, dtype=np.intp)
+    work = integer_points(pts)
+    if work is None:
+        work = pts
+
+    for i in range(n - 1):
+        if n - i <= len(best):
+            break  # no line starting at this anchor can be larger
+        line = anchor_best_line(work, i)
+        if len(line) > len(best):
+            best = line
+
+    best = np.sort(best)
+    collinear_points = [tuple(pts[i].tolist()) for i in best]
+    return collinear_points, best
+
+# Whether some point before pts[i] lies on the line through pts[i] and
+# q[r], for each row of q (points after i on distinct non-vertical lines).
+# Same slope filter and exact test as anchor_runs, against the earlier points
+# instead of the later ones: equal float slopes confirmed in int64 on the
+# integer path, near slopes confirmed with orient_many otherwise.
+def on_earlier_point(pts, i, q):
+    d = pts[:i] - pts[i]
+    if np.any((d[:, 0] == 0) & (d[:, 1] == 0)):
+        return np.ones(len(q), dtype=bool)  # an earlier copy of pts[i] is on every line
+    prev = np.flatnonzero(d[:, 0] != 0)
+    slopes = d[prev, 1] / d[prev, 0]
+    order = np.argsort(slopes)
+    s, prev = slopes[order], prev[order]
+    dq = q - pts[i]
+    t = dq[:, 1] / dq[:, 0]
+    if pts.dtype.kind == 'i':
+        lo, hi = np.searchsorted(s, t, 'left'), np.searchsorted(s, t, 'right')
+    else:
+        w = 16 * U * np.abs(t)
+        lo, hi = np.searchsorted(s, t - w, 'left'), np.searchsorted(s, t + w, 'right')
+    counts = hi - lo
+    r = np.repeat(np.arange(len(q)), counts)
+    k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(lo, counts)
+    if pts.dtype.kind == 'i':
+        dp = d[prev[k]]
+        ok = dq[r, 1] * dp[:, 0] == dp[:, 1] * dq[r, 0]
+    else:
+        ok = orient_many(q[r], pts[prev[k]], pts[i]) == 0
+    return np.bincount(r[ok], minlength=len(q)) > 0
+
+# Lines holding at least min_points points, or only the `top` heaviest of them,
+# in one anchor pass. Each line is reported at its smallest point index, the
+# first anchor it shows up at: a run is skipped if a point before the anchor
+# lies on it. The floor only rises, so a run large enough at a later anchor
+# was taken at the first one. With top set, a min-heap of the kept lines
+# raises the bar as it fills, so memory stays proportional to the answer.
+# Returns sorted index arrays, heaviest first, ties in anchor order.
+def heavy_lines(pts, min_points=3, top=None):
+    pts = np.asarray(pts, dtype=np.float64).reshape(-1, 2)
+    n = len(pts)
+    kept = []  # (size, -seq, line); the smallest, latest line on top
+    seq = 0
+    work = integer_points(pts)
+    if work is None:
+        work = pts
+
+    for i in range(n - 1):
+        floor = min_points
+        if top is not None and len(kept) >= top:
+            floor = max(floor, kept[0][0] + 1)
+        if n - i < floor:
+            break  # no line starting at this anchor can be large enough
+        runs = anchor_runs(work, i)
+        if runs is None:
+            continue
+        dups, idx, order, starts, counts = runs
+
+        big = np.flatnonzero(counts + 1 + len(dups) >= floor)
+        if len(big) == 0:
+            continue
+        big = big[~on_earlier_point(work, i, work[idx[order[starts[big]]]])]
+        for r in big:
+            line = np.r_[i, dups, idx[order[starts[r]:starts[r] + counts[r]]]]
+            entry = (len(line), -seq, line)
+            seq += 1
+            if top is None:
+                kept.append(entry)
+            elif len(kept) < top:
+                heapq.heappush(kept, entry)
+            elif entry[:2] > kept[0][:2]:
+                heapq.heapreplace(kept, entry)
+            if top is not None and len(kept) >= top:
+                floor = max(floor, kept[0][0] + 1)
+
+    kept.sort(key=lambda e: (-e[0], -e[1]))
+    return [np.sort(line) for _, _, line in kept]
+
+# Past a few hundred points the dual lines are drawn as one collection, dense
+# layers are rasterised and the per-point labels are left out; see
+# common/plotting.py
 def plot_primal_and_dual(primal_points, duals, intersections, collinear_points, input_file):
+    import matplotlib.pyplot as plt
+
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
 
-    cmap = cm.get_cmap("tab10", len(primal_points))
-    all_x, all_y = [], []
+    pts = np.asarray(primal_points, dtype=np.float64).reshape(-1, 2)
+    colors = palette(len(pts))
+    labelled = len(pts) <= LABEL_LIMIT
 
     # --- Left Plot: Primal Points ---
-    for i, pt in enumerate(primal_points):
-        color = cmap(i)
-        all_x.append(pt[0])
-        all_y.append(pt[1])
-        ax1.plot(pt[0], pt[1], 'o', color=color)
-        ax1.text(pt[0]+0.1, pt[1], f"{pt}", fontsize=8, color=color)
+    add_points(ax1, pts, colors[:len(pts)])
+    if labelled:
+        for i, pt in enumerate(primal_points):
+            ax1.text(pt[0]+0.1, pt[1], f"{pt}", fontsize=8, color=colors[i])
 
     ax1.set_title("Primal Points")
     ax1.set_aspect('equal')
     ax1.grid(True)
 
     # Extend x and y range slightly
-    x_margin = (max(all_x) - min(all_x)) * 0.2
-    y_margin = (max(all_y) - min(all_y)) * 0.1
-    ax1.set_xlim(min(all_x) - x_margin, max(all_x) + x_margin)
-    ax1.set_ylim(min(all_y) - y_margin, max(all_y) + y_margin)
+    (min_x, min_y), (max_x, max_y) = pts.min(axis=0), pts.max(axis=0)
+    x_margin = (max_x - min_x) * 0.2
+    y_margin = (max_y - min_y) * 0.1
+    ax1.set_xlim(min_x - x_margin, max_x + x_margin)
+    ax1.set_ylim(min_y - y_margin, max_y + y_margin)
 
     # --- Right Plot: Dual Lines and Intersections ---
-    x_vals = np.linspace(-10, 10, 500)
-    all_dual_y = []
-
-    for i, (a, b) in enumerate(duals):
-        y_vals = a * x_vals + b
-        color = cmap(i)
-        ax2.plot(x_vals, y_vals, color=color, linewidth=1)
-        all_dual_y.extend(y_vals)
+    # Each line is straight, so its two ends at x = -10 and 10 are enough
+    lines = np.asarray(duals, dtype=np.float64).reshape(-1, 2)
+    ends = np.array([-10.0, 10.0])
+    ys = lines[:, :1] * ends + lines[:, 1:]
+    add_lines(ax2, np.stack((np.broadcast_to(ends, ys.shape), ys), axis=-1), colors[:len(lines)], 1)
+    all_dual_y = ys.ravel()
 
     # Plot intersections
     if intersections:
-        ix, iy = zip(*intersections.keys())
-        ax2.plot(ix, iy, 'ro', label='Intersections')
-        all_dual_y.extend(iy)
+        ixy = np.array(list(intersections.keys()), dtype=np.float64)
+        add_points(ax2, ixy, 'red', 'Intersections')
+        all_dual_y = np.concatenate((all_dual_y, ixy[:, 1]))
 
     ax2.set_title("Dual Lines and Intersections")
     ax2.set_aspect('auto')
     ax2.grid(True)
 
     # Extend y-axis for dual plot
-    y_margin_dual = (max(all_dual_y) - min(all_dual_y)) * 0.1
-    ax2.set_ylim(min(all_dual_y) - y_margin_dual, max(all_dual_y) + y_margin_dual)
+    y_margin_dual = (all_dual_y.max() - all_dual_y.min()) * 0.1
+    ax2.set_ylim(all_dual_y.min() - y_margin_dual, all_dual_y.max() + y_margin_dual)
 
     # Add legend with primal point info
-    for i, pt in enumerate(primal_points):
-        ax2.text(1.02, 0.98 - i * 0.05, f"{pt}", transform=ax2.transAxes,
-                 fontsize=10, color=cmap(i), ha='left', va='top')
+    if labelled:
+        for i, pt in enumerate(primal_points):
+            ax2.text(1.02, 0.98 - i * 0.05, f"{pt}", transform=ax2.transAxes,
+                     fontsize=10, color=colors[i], ha='left', va='top')
 
-    ax2.legend()
+    if intersections:
+        ax2.legend()
 
     # Save output
     image_filename = f"{input_file.split('.')[0]}.png"
     plt.tight_layout()
-    plt.savefig(image_filename)
+    fig.savefig(image_filename)
     print(f"Plot saved as {image_filename}")
 
 if __name__ == "__main__":
+    flags = pop_flags(sys.argv, '--no-plot', '--timing', '--cache')
+    min_points = pop_option(sys.argv, '--min-points', type=int)
+    top = pop_option(sys.argv, '--top', type=int)
+    timer = PhaseTimer(T0)
+    timer.mark('startup')
     if len(sys.argv) != 2:
-        print("Usage: python3 main.py <filename>")
+        print("Usage: python3 main.py [--no-plot] [--timing] [--cache] [--min-points K] [--top K] <filename>")
         sys.exit(1)
 
     filename = sys.argv[1]
-    primal_points = read_points(filename)
-    collinear_points, duals, intersections = find_intersections_and_collinear(primal_points)
+    points = read_points(filename)
+    timer.mark('read')
+
+    # Query mode: a table of every heavy line instead of the single largest
+    if min_points is not None or top is not None:
+        lines = heavy_lines(points, min_points or 3, top)
+        timer.mark('compute')
+        print("points  indices")
+        for line in lines:
+            print(f"{len(line):<7} " + " ".join(map(str, line.tolist())))
+        timer.mark('output')
+        if '--timing' in flags:
+            timer.report()
+        sys.exit(0)
+
+    if '--cache' in flags:
+        best = ResultCache().cached(points, 'main.find_max_collinear',
+                                    lambda: {'indices': find_max_collinear(points)[1]})['indices']
+        collinear_points = [tuple(points[i].tolist()) for i in best]
+    else:
+        collinear_points, _ = find_max_collinear(points)
+    timer.mark('compute')
 
     print("\nMax subset of collinear points:")
     for pt in collinear_points:
         print(pt)
+    timer.mark('output')
 
-    plot_primal_and_dual(primal_points, duals, intersections, collinear_points, filename)
+    if '--no-plot' not in flags:
+        primal_points = [tuple(pt) for pt in points.tolist()]
+        duals = [dual_line(pt) for pt in primal_points]
+        intersections = dual_intersections(duals)
+        plot_primal_and_dual(primal_points, duals, intersections, collinear_points, filename)
+        timer.mark('plot')
+    if '--timing' in flags:
+        timer.report()
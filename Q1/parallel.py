@@ -0,0 +1,94 @@
+import time
+T0 = time.perf_counter()
+import os
+import sys
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.pointio import read_points
+from common.cli import pop_flags
+from common.timing import PhaseTimer
+from main import anchor_best_line, find_max_collinear, integer_points
+
+# Multi-core version of main.find_max_collinear.
+#
+# The points are copied once into a shared memory block that every worker maps
+# at start-up, so tasks only carry anchor ranges. Anchor i scans the n - i
+# points after it, so task t takes anchors t, t + T, t + 2T, ... to even out
+# the work. Workers share the size of the best line found so far and skip
+# anchors that cannot beat it, and each task sends back only its best line.
+
+_pts = None
+_shm = None
+_best = None
+
+def _attach(name, n, dtype, best):
+    global _pts, _shm, _best
+    _shm = shared_memory.SharedMemory(name=name)
+    _pts = np.ndarray((n, 2), dtype=dtype, buffer=_shm.buf)
+    _best = best
+
+# Best line over anchors start, start + step, ...: (size, anchor, indices)
+def _scan(start, step):
+    n = len(_pts)
+    best = np.empty(0, dtype=np.intp)
+    anchor = n
+    for i in range(start, n - 1, step):
+        if n - i <= max(len(best), _best.value):
+            break  # anchors only get smaller from here
+        line = anchor_best_line(_pts, i)
+        if len(line) > len(best):
+            best, anchor = line, i
+            with _best.get_lock():
+                _best.value = max(_best.value, len(line))
+    return len(best), anchor, best
+
+# Same result as find_max_collinear, including ties: the largest line, and
+# among those the one from the smallest anchor
+def parallel_max_collinear(pts, workers=None, tasks_per_worker=4):
+    pts = np.ascontiguousarray(pts, dtype=np.float64).reshape(-1, 2)
+    n = len(pts)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or n < 64:
+        return find_max_collinear(pts)
+
+    # Integer inputs are shared as int64 for main's exact integer path
+    work = integer_points(pts)
+    if work is None:
+        work = pts
+    shm = shared_memory.SharedMemory(create=True, size=max(work.nbytes, 1))
+    try:
+        np.ndarray(work.shape, dtype=work.dtype, buffer=shm.buf)[:] = work
+        best = mp.Value('l', 0)
+        step = workers * tasks_per_worker
+        with mp.Pool(workers, initializer=_attach, initargs=(shm.name, n, work.dtype.str, best)) as pool:
+            results = pool.starmap(_scan, [(t, step) for t in range(step)])
+    finally:
+        shm.close()
+        shm.unlink()
+
+    size, _, line = max(results, key=lambda r: (r[0], -r[1]))
+    line = np.sort(line)
+    return [tuple(pts[i].tolist()) for i in line], line
+
+if __name__ == "__main__":
+    flags = pop_flags(sys.argv, '--timing')
+    timer = PhaseTimer(T0)
+    timer.mark('startup')
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python3 parallel.py [--timing] <points file> [workers]")
+        sys.exit(1)
+
+    points = read_points(sys.argv[1])
+    workers = int(sys.argv[2]) if len(sys.argv) == 3 else None
+    timer.mark('read')
+    collinear_points, _ = parallel_max_collinear(points, workers)
+    timer.mark('compute')
+
+    print("\nMax subset of collinear points:")
+    for pt in collinear_points:
+        print(pt)
+    timer.mark('output')
+    if '--timing' in flags:
+        timer.report()
@@ -0,0 +1,65 @@
+import time
+T0 = time.perf_counter()
+import os
+import sys
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.pointio import read_points
+from common.cli import pop_flags, pop_option
+from common.timing import PhaseTimer
+from common.cache import ResultCache
+from dual import dual_lines, bounding_box, clip_lines
+from q1 import build_segments, sweep, largest_vertex, SweepMetrics
+
+# Max collinear subset of an (n, 2) point array, computed in one process:
+# the dual lines, their clipped segments and the sweep all share arrays,
+# and segment i keeps the exact dual line of the point it came from.
+# Returns the sorted indices of the points on the common line; metrics, a
+# q1.SweepMetrics, also gets the dualise/clip and sweep times.
+def max_collinear(points, metrics=None):
+    timer = PhaseTimer()
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    duals = dual_lines(points)
+    bbox = bounding_box(duals) if len(duals) > 1 else None
+    if bbox is None:
+        return np.empty(0, dtype=np.intp)
+
+    segs, idx = clip_lines(duals, bbox)
+    timer.mark('dualise/clip')
+    sl = sweep(build_segments(segs, duals[idx], idx), metrics)
+    _, max_segs = largest_vertex(sl)
+    timer.mark('sweep')
+    if metrics is not None:
+        metrics.phases.update(timer.as_dict())
+    return np.array(sorted(max_segs), dtype=np.intp)
+
+if __name__ == "__main__":
+    flags = pop_flags(sys.argv, '--timing', '--cache')
+    metrics_file = pop_option(sys.argv, '--metrics')
+    metrics = SweepMetrics() if metrics_file else None
+    timer = PhaseTimer(T0)
+    timer.mark('startup')
+    if len(sys.argv) != 2:
+        print("Usage: python3 pipeline.py [--timing] [--cache] [--metrics FILE|-] <points file>")
+        sys.exit(1)
+
+    points = read_points(sys.argv[1])
+    timer.mark('read')
+    if '--cache' in flags and metrics is None:
+        best = ResultCache().cached(points, 'pipeline.max_collinear',
+                                    lambda: {'indices': max_collinear(points)})['indices']
+    else:
+        best = max_collinear(points, metrics)
+    timer.mark('compute')
+    if len(best):
+        print("Largest subset of points that lie on a common line ::")
+        for x, y in points[best].tolist():
+            print(f"{x}, {y}")
+    else:
+        print("No segment intersections found.")
+    timer.mark('output')
+    if '--timing' in flags:
+        timer.report()
+    if metrics is not None:
+        metrics.phases = {**timer.as_dict(), **metrics.phases}
+        metrics.dump(metrics_file)
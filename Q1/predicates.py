@@ -0,0 +1,160 @@
+import sys
+import math
+from fractions import Fraction
+from collections import defaultdict
+import numpy as np
+
+# Filtered geometric predicates for the dual sweeps.
+#
+# Every predicate here reduces to the sign of
+#     (p - q) * (r - s) - (t - u) * (v - w)
+# for float inputs p..w. Evaluated in floating point that is two rounded
+# differences, one rounded product and one rounded subtraction per side, and
+# Shewchuk's bound for orient2d (ccwerrboundA) covers exactly this shape:
+# the float sign is correct whenever |det| > (3 + 16u) u (|left| + |right|).
+# Only when the filter fails is the expression re-evaluated with Fractions.
+# Lines are (a, b) pairs meaning y = a x + b, the dual of the point (a, -b).
+
+U = sys.float_info.epsilon / 2  # unit roundoff, 2**-53
+DET_BOUND = (3.0 + 16.0 * U) * U
+
+def _sign(v):
+    return int(v > 0) - int(v < 0)
+
+def det2(p, q, r, s, t, u, v, w):
+    left = (p - q) * (r - s)
+    right = (t - u) * (v - w)
+    det = left - right
+    if abs(det) > DET_BOUND * (abs(left) + abs(right)):
+        return _sign(det)
+    if (p == q or r == s) and (t == u or v == w):
+        return 0  # both products are exactly zero, not underflowed
+    p, q, r, s, t, u, v, w = map(Fraction, (p, q, r, s, t, u, v, w))
+    return _sign((p - q) * (r - s) - (t - u) * (v - w))
+
+# +1 if a, b, c turn counter-clockwise, -1 if clockwise, 0 if collinear
+def orient(a, b, c):
+    return det2(a[0], c[0], b[1], c[1], a[1], c[1], b[0], c[0])
+
+# True if the three lines pass through one point
+def concurrent(l1, l2, l3):
+    if l1[0] == l2[0] == l3[0]:
+        return False  # all parallel
+    return orient(l1, l2, l3) == 0
+
+# Sign of x(l1 & l2) - x(l3 & l4); each pair must not be parallel
+def compare_x(l1, l2, l3, l4):
+    s = det2(l2[1], l1[1], l3[0], l4[0], l4[1], l3[1], l1[0], l2[0])
+    return s * _sign(l1[0] - l2[0]) * _sign(l3[0] - l4[0])
+
+# Sign of x(l1 & l2) - x0 for a plain float x0
+def compare_vertex_x(l1, l2, x0):
+    s = det2(l2[1], l1[1], 1.0, 0.0, x0, 0.0, l1[0], l2[0])
+    return s * _sign(l1[0] - l2[0])
+
+# Sign of y_i(x) - y_j(x) for a plain float x
+def compare_y(li, lj, x):
+    return det2(li[0], lj[0], x, 0.0, lj[1], li[1], 1.0, 0.0)
+
+# Sign of y_i - y_j at the vertex l1 & l2
+def compare_y_at_vertex(li, lj, l1, l2):
+    s = det2(li[0], lj[0], l2[1], l1[1], lj[1], li[1], l1[0], l2[0])
+    return s * _sign(l1[0] - l2[0])
+
+# Vectorised orient(a[k], b[k], c) for arrays of points a, b and one point c.
+# Filter failures are settled exactly: small integer coordinates make the
+# float evaluation exact already, anything else goes through orient().
+def orient_many(a, b, c):
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 2)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 2)
+    c = np.asarray(c, dtype=np.float64)
+    left = (a[:, 0] - c[0]) * (b[:, 1] - c[1])
+    right = (a[:, 1] - c[1]) * (b[:, 0] - c[0])
+    det = left - right
+    bound = DET_BOUND * (np.abs(left) + np.abs(right))
+    sign = np.sign(det).astype(np.int8)
+
+    unsure = np.flatnonzero((np.abs(det) <= bound) & (bound > 0))
+    if len(unsure):
+        vals = np.concatenate((a[unsure], b[unsure], np.broadcast_to(c, (len(unsure), 2))), axis=1)
+        small_int = np.all((vals == np.floor(vals)) & (np.abs(vals) < 2.0 ** 25), axis=1)
+        for k in unsure[~small_int]:
+            sign[k] = orient(a[k].tolist(), b[k].tolist(), c.tolist())
+    return sign
+
+# Exact x and y of the vertex l1 & l2 as Fractions
+def exact_vertex(l1, l2):
+    a1, b1 = Fraction(l1[0]), Fraction(l1[1])
+    a2, b2 = Fraction(l2[0]), Fraction(l2[1])
+    x = (b2 - b1) / (a1 - a2)
+    return x, a1 * x + b1
+
+class VertexTable:
+    # Canonical keys for arrangement vertices.
+    #
+    # A vertex computed in floats as x = (b2-b1)/(a1-a2), y = a1*x + b1 is
+    # within 4u|x| and 6u(|a1 x| + |b1|) of the true point. When both bounds
+    # are under a quarter cell, the float point only selects a grid cell and
+    # candidates in the 3x3 neighbourhood are matched with concurrent(), so
+    # one vertex is never split by rounding and two close vertices are never
+    # merged. Points too large for the grid are keyed by exact coordinates.
+    # Keys are the float points themselves, nudged by an ulp in y if two
+    # distinct vertices happen to round to the same floats.
+    def __init__(self, cell=2.0 ** -20):
+        self.cell = cell
+        self.cells = defaultdict(list)
+        self.exact = {}
+        self.keys = set()
+        self.home = {}  # key -> where lookup() filed it, for retire()
+
+    def _new_key(self, x, y):
+        key = (x + 0.0, y + 0.0)  # +0.0 folds -0.0 into 0.0
+        while key in self.keys:
+            key = (key[0], math.nextafter(key[1], math.inf))
+        self.keys.add(key)
+        return key
+
+    def lookup(self, l1, l2, p=None):
+        (a1, b1), (a2, b2) = l1, l2
+        if p is None:
+            x = (b2 - b1) / (a1 - a2)
+            p = (x, a1 * x + b1)
+        x, y = p
+        limit = self.cell / 4
+        if 4 * U * abs(x) > limit or 6 * U * (abs(a1 * x) + abs(b1)) + 1e-300 > limit:
+            X, Y = exact_vertex(l1, l2)
+            x, y = float(X), float(Y)
+            if U * max(abs(x), abs(y)) > limit:
+                if (X, Y) not in self.exact:
+                    key = self.exact[(X, Y)] = self._new_key(x, y)
+                    self.home[key] = (self.exact, (X, Y))
+                return self.exact[(X, Y)]
+
+        cx, cy = int(x // self.cell), int(y // self.cell)
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                for key, m1, m2 in self.cells.get((gx, gy), ()):
+                    if concurrent(m1, m2, l1) and concurrent(m1, m2, l2):
+                        return key
+        key = self._new_key(x, y)
+        self.cells[(cx, cy)].append((key, l1, l2))
+        self.home[key] = (self.cells, (cx, cy))
+        return key
+
+    # Forgets a key returned by lookup(); the vertex gets a new key if seen again
+    def discard(self, key):
+        self.retire(key)
+        self.keys.discard(key)
+
+    # Stops matching a key returned by lookup() but keeps the key taken, so
+    # the table holds only live vertices and no later one gets the same key
+    def retire(self, key):
+        table, where = self.home.pop(key)
+        if table is self.exact:
+            del self.exact[where]
+            return
+        cell = [e for e in self.cells[where] if e[0] != key]
+        if cell:
+            self.cells[where] = cell
+        else:
+            del self.cells[where]
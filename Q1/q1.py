@@ -1,312 +1,526 @@
+import time
+T0 = time.perf_counter()
 import heapq
+from array import array
+from bisect import insort
+import json
+import numpy as np
+import os
 import sys
-from collections import namedtuple, defaultdict
-from shapely.geometry import LineString, Point as ShapelyPoint
-import matplotlib.pyplot as plt
-import matplotlib.cm as cm
+from collections import defaultdict
+from functools import cmp_to_key
+from predicates import U, VertexTable, compare_x, compare_vertex_x, compare_y, compare_y_at_vertex
 import warnings
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.pointio import read_points
+from common.cli import pop_flags, pop_option
+from common.timing import PhaseTimer
+from common.plotting import LABEL_LIMIT, palette, add_lines, add_points
 warnings.filterwarnings("ignore")
 
-EPS = 1e-6
-Event = namedtuple("Event", ["x","y","type","point","segments"])
-
-def dcmp(x):
-    if x < -EPS: return -1
-    if x > EPS:  return 1
-    return 0
-
-# Check if point p lies on segment seg
-def is_interior(seg, p):
-    (x1,y1),(x2,y2) = seg.p1, seg.p2
-    cross = (y2-y1)*(p[0]-x1) - (x2-x1)*(p[1]-y1)
-    if abs(cross)>EPS: return False
-    return min(x1,x2)-EPS <= p[0] <= max(x1,x2)+EPS and \
-           min(y1,y2)-EPS <= p[1] <= max(y1,y2)+EPS
-
-class Segment:
-    def __init__(self,p1,p2,index):
-        if p1[0]>p2[0] or (dcmp(p1[0]-p2[0])==0 and p1[1]>p2[1]):
-            p1,p2 = p2,p1
-        self.p1,self.p2 = p1,p2
-        self.index = index
-        self.geom = LineString([p1,p2])
-    def get_y(self,x):
-        t = (x-self.p1[0])/(self.p2[0]-self.p1[0])
-        return self.p1[1] + t*(self.p2[1]-self.p1[1])
-    def __lt__(self,other):
-        y1=self.get_y(SweepLine.x)
-        y2=other.get_y(SweepLine.x)
-        if dcmp(y1-y2)!=0: return y1<y2
-        return self.index<other.index
-
-class Node:
-    def __init__(self,seg):
-        self.seg = seg
-        self.link = [None,None]
-        self.par = None
-        self.prev = None
-        self.next = None
+# Events are plain (x, kind, point, i, j) tuples: kind is START, INTERSECT or
+# END, point the vertex's (x, y) key or the endpoint's y, and i, j the ids of
+# its segments in the sweep (j is -1 for endpoint events). The heap orders
+# them by x and kind; run() puts each batch of nearby events in exact order.
+START, INTERSECT, END = 0, 1, 2
+EVENT_TYPES = ('start', 'intersect', 'end')
+
+class Segments:
+    # The segments of a sweep as columns indexed by segment id, not one object
+    # each: endpoints (x1, y1) and (x2, y2) with x1 < x2, the exact slope m and
+    # intercept c of the dual line each was clipped from, and index, the point
+    # whose dual it is. rows holds x1 y1 x2 y2 (x1 != x2); a lines row of NaNs,
+    # or lines=None, recovers the form from the endpoints.
+    def __init__(self,rows,lines=None,index=None):
+        rows=np.array(rows,dtype=np.float64).reshape(-1,4)
+        swap=rows[:,0]>rows[:,2]
+        rows[swap]=rows[swap][:,[2,3,0,1]]
+        x1,y1,x2,y2=rows.T
+        m=(y2-y1)/(x2-x1)
+        form=np.column_stack((m,y1-m*x1))
+        if lines is not None:
+            lines=np.array(lines,dtype=np.float64).reshape(-1,2)
+            form=np.where(np.isnan(lines),form,lines)
+        if index is None:
+            index=np.arange(len(rows))
+        self.x1,self.y1,self.x2,self.y2=(array('d',col.tolist()) for col in rows.T)
+        self.m,self.c=(array('d',col.tolist()) for col in form.T)
+        self.index=array('q',np.asarray(index,dtype=np.int64).tolist())
+    def __len__(self):
+        return len(self.index)
+    # Segment i as (p1, p2, index)
+    def __getitem__(self,i):
+        return (self.x1[i],self.y1[i]),(self.x2[i],self.y2[i]),self.index[i]
+    # Exact (slope, intercept) of segment i, as the predicates take it
+    def line(self,i):
+        return self.m[i],self.c[i]
+
+# A float vertex x is within 4u|x| of the true one, so an event at float x1
+# is surely after one at x2 only past this margin
+def past(x1,x2):
+    return x1-x2>8*U*max(abs(x1),abs(x2))
+
+# Intersection point of segments i and j of segs as an (x, y) tuple, or None.
+# Parallel (and overlapping collinear) segments give None, matching the
+# sweep's old handling of non-Point shapely results.
+def segment_intersection(segs,i,j):
+    m,c=segs.m,segs.c
+    dm = m[i] - m[j]
+    if dm == 0: return None
+    x = (c[j] - c[i])/dm
+    if x < max(segs.x1[i],segs.x1[j]) or x > min(segs.x2[i],segs.x2[j]):
+        return None
+    return (x, m[i]*x + c[i])
+
+class SweepMetrics:
+    # Opt-in counters for SweepLine and its SplayTree. The hot paths only pay
+    # an "is not None" test when metrics are off. Histograms map a size to how
+    # often it occurred.
+    def __init__(self):
+        self.events=defaultdict(int)    # popped events by type
+        self.batches=defaultdict(int)   # events per batch in run()
+        self.degrees=defaultdict(int)   # segments through a vertex
+        self.walks=defaultdict(int)     # exact tests per vertex to find its run
+        self.splays=0
+        self.rotations=0                # a splay of a node at depth d rotates d times
+        self.checks=0                   # check_intersection calls
+        self.hits=0                     # ... that found an intersection
+        self.new_vertices=0             # ... at a vertex not seen before
+        self.phases={}                  # ms, filled in by the callers
+    def as_dict(self):
+        hist=lambda h: {str(k): h[k] for k in sorted(h)}
+        steps=sum(k*v for k,v in self.walks.items())
+        return {
+            'phases_ms': dict(self.phases),
+            'events': dict(self.events),
+            'batch_sizes': hist(self.batches),
+            'vertex_degrees': hist(self.degrees),
+            'walk_lengths': hist(self.walks),
+            'walk_steps': steps,
+            'splays': self.splays,
+            'rotations': self.rotations,
+            'rotations_per_splay': self.rotations/self.splays if self.splays else 0.0,
+            'checks': self.checks,
+            'check_hits': self.hits,
+            'new_vertices': self.new_vertices,
+        }
+    # Writes as_dict() as JSON to path, or to stdout for '-'
+    def dump(self,path):
+        if path=='-':
+            json.dump(self.as_dict(),sys.stdout,indent=1); print()
+        else:
+            with open(path,'w') as f: json.dump(self.as_dict(),f,indent=1)
 
 class SplayTree:
-    def __init__(self): self.root=None
+    # Splay tree over the n segments of a sweep, stored as int64 arrays of
+    # links indexed by segment id, allocated once; -1 is the null link.
+    # prev/next thread the nodes in order. below(i, j) is the order.
+    def __init__(self,n,below,metrics=None):
+        self.below=below
+        self.root=-1
+        self.left,self.right,self.par,self.prev,self.next=(array('q',[-1])*n for _ in range(5))
+        self.live=bytearray(n)
+        self.metrics=metrics
     def rotate(self,x):
-        p=x.par
-        if not p: return
-        g=p.par
-        if p.link[0] is x:
-            p.link[0]=x.link[1]
-            if x.link[1]: x.link[1].par=p
-            x.link[1]=p
+        left,right,par=self.left,self.right,self.par
+        p=par[x]
+        if p<0: return
+        g=par[p]
+        if left[p]==x:
+            b=left[p]=right[x]
+            if b>=0: par[b]=p
+            right[x]=p
         else:
-            p.link[1]=x.link[0]
-            if x.link[0]: x.link[0].par=p
-            x.link[0]=p
-        p.par=x
-        x.par=g
-        if g:
-            if g.link[0] is p: g.link[0]=x
-            else:           g.link[1]=x
+            b=right[p]=left[x]
+            if b>=0: par[b]=p
+            left[x]=p
+        par[p]=x
+        par[x]=g
+        if g>=0:
+            if left[g]==p: left[g]=x
+            else:          right[g]=x
         else:
             self.root=x
     def splay(self,x):
-        while x.par:
-            p=x.par
-            g=p.par
-            if not g: self.rotate(x)
-            elif (g.link[0] is p)==(p.link[0] is x):
+        left,par=self.left,self.par
+        if self.metrics is not None:
+            d=0; p=par[x]
+            while p>=0: d+=1; p=par[p]
+            self.metrics.splays+=1
+            self.metrics.rotations+=d
+        while par[x]>=0:
+            p=par[x]
+            g=par[p]
+            if g<0: self.rotate(x)
+            elif (left[g]==p)==(left[p]==x):
                 self.rotate(p); self.rotate(x)
             else:
                 self.rotate(x); self.rotate(x)
-    def insert(self,node):
-        pred=succ=None
+    def insert(self,x):
+        below,left,right,par,prev,next=self.below,self.left,self.right,self.par,self.prev,self.next
+        self.live[x]=1
+        pred=succ=-1
         cur=self.root
-        while cur:
-            if cur.seg<node.seg:
-                pred=cur; cur=cur.link[1]
+        while cur>=0:
+            if below(cur,x):
+                pred=cur; cur=right[cur]
             else:
-                cur=cur.link[0]
+                cur=left[cur]
         cur=self.root
-        while cur:
-            if node.seg<cur.seg:
-                succ=cur; cur=cur.link[0]
+        while cur>=0:
+            if below(x,cur):
+                succ=cur; cur=left[cur]
             else:
-                cur=cur.link[1]
-        if not self.root:
-            self.root=node; return
-        if pred:
+                cur=right[cur]
+        if self.root<0:
+            self.root=x; return
+        if pred>=0:
             self.splay(pred)
-            node.link[1]=pred.link[1]
-            if node.link[1]: node.link[1].par=node
-            pred.link[1]=node
-            node.par=pred
-            node.prev=pred; node.next=pred.next
-            if pred.next: pred.next.prev=node
-            pred.next=node
+            b=right[x]=right[pred]
+            if b>=0: par[b]=x
+            right[pred]=x
+            par[x]=pred
+            prev[x]=pred; next[x]=n=next[pred]
+            if n>=0: prev[n]=x
+            next[pred]=x
         else:
             self.splay(succ)
-            node.link[0]=succ.link[0]
-            if node.link[0]: node.link[0].par=node
-            succ.link[0]=node
-            node.par=succ
-            node.next=succ; node.prev=succ.prev
-            if succ.prev: succ.prev.next=node
-            succ.prev=node
-    def erase(self,node):
-        if node.prev: node.prev.next=node.next
-        if node.next: node.next.prev=node.prev
-        self.splay(node)
-        if not node.link[0]:
-            self.root=node.link[1]
-            if self.root: self.root.par=None
+            b=left[x]=left[succ]
+            if b>=0: par[b]=x
+            left[succ]=x
+            par[x]=succ
+            next[x]=succ; prev[x]=q=prev[succ]
+            if q>=0: next[q]=x
+            prev[succ]=x
+    def erase(self,x):
+        left,right,par,prev,next=self.left,self.right,self.par,self.prev,self.next
+        if prev[x]>=0: next[prev[x]]=next[x]
+        if next[x]>=0: prev[next[x]]=prev[x]
+        self.splay(x)
+        if left[x]<0:
+            self.root=right[x]
+            if self.root>=0: par[self.root]=-1
         else:
-            L=node.link[0]; L.par=None
+            L=left[x]; par[L]=-1
             m=L
-            while m.link[1]: m=m.link[1]
+            while right[m]>=0: m=right[m]
             self.splay(m)
-            m.link[1]=node.link[1]
-            if m.link[1]: m.link[1].par=m
+            b=right[m]=right[x]
+            if b>=0: par[b]=m
             self.root=m
-        node.link=[None,None]; node.par=None; node.prev=node.next=None
+        left[x]=right[x]=par[x]=prev[x]=next[x]=-1
+        self.live[x]=0
+    # Puts new, a permutation of the consecutive in-order run old, into old's
+    # places: new[t] takes over old[t]'s links, so the shape of the tree is
+    # kept and no comparison or splay is needed. O(k) for a run of k nodes.
+    def relabel(self,old,new):
+        left,right,par,prev,next=self.left,self.right,self.par,self.prev,self.next
+        f=dict(zip(old,new))
+        links=[(left[x],right[x],par[x],prev[x],next[x]) for x in old]
+        for y,link in zip(new,links):
+            left[y],right[y],par[y],prev[y],next[y]=[f.get(v,v) for v in link]
+        # Links into the run from outside it
+        for x,(l,r,p,pv,nx) in zip(old,links):
+            y=f[x]
+            if l>=0 and l not in f: par[l]=y
+            if r>=0 and r not in f: par[r]=y
+            if p<0: self.root=y
+            elif p not in f:
+                if left[p]==x: left[p]=y
+                else:          right[p]=y
+            if pv>=0 and pv not in f: next[pv]=y
+            if nx>=0 and nx not in f: prev[nx]=y
 
 class SweepLine:
+    # Sweep position: a float x for endpoint events, or the pair of lines
+    # whose vertex is being processed so segments compare exactly there
     x=-1e20
-    def __init__(self):
-        self.tree=SplayTree()
-        self.events=[]
-        self.intersections=set()
-        self.node_map={}
-        self.point_to_segments=defaultdict(set)
-
-    def add_segment(self,seg):
-        heapq.heappush(self.events,Event(seg.p1[0],seg.p1[1],'start',seg.p1,[seg]))
-        heapq.heappush(self.events,Event(seg.p2[0],seg.p2[1],'end',seg.p2,[seg]))
-
-    def add_intersection_event(self,p,s1,s2):
-        heapq.heappush(self.events,Event(p.x,p.y,'intersect',(p.x,p.y),[s1,s2]))
-
-    def handle_event(self,p,segs):
-        U=[s for s in segs if s.p1==p]
-        L=[s for s in segs if s.p2==p]
-        C=[s for s in segs if s not in U and s not in L and is_interior(s,p)]
-        if len(U)+len(L)+len(C)>=2:
-            pt=(round(p[0],3),round(p[1],3))
-            self.intersections.add(pt)
-            self.point_to_segments[pt].update([s.index for s in U+L+C])
-        for s in L+C:
-            node=self.node_map.pop(s,None)
-            if node: self.tree.erase(node)
-        C.reverse()
-        for s in U+C:
-            node=Node(s)
-            self.node_map[s]=node
-            self.tree.insert(node)
-        combo=U+C
-        if not combo:
-            sl=node.prev.seg if node.prev else None
-            sr=node.next.seg if node.next else None
-            self.check_intersection(sl,sr)
+    vertex=None
+    # segs is a Segments. point_to_segments maps each vertex passed to the
+    # sorted tuple of point indices whose lines meet there; vertices ahead are
+    # only in the VertexTable and queued, and leave both once handled.
+    def __init__(self,segs,metrics=None):
+        self.metrics=metrics
+        self.segs=segs
+        n=len(segs)
+        self.tree=SplayTree(n,self.below,metrics)
+        self.events=[(segs.x1[i],START,segs.y1[i],i,-1) for i in range(n)]
+        self.events+=[(segs.x2[i],END,segs.y2[i],i,-1) for i in range(n)]
+        heapq.heapify(self.events)
+        self.vertices=VertexTable()
+        self.queued=set()   # keys of vertices with an event not yet handled
+        self.point_to_segments={}
+        self.kind=None      # kind of the event being handled
+        self.batch=None     # events of the current x window, in exact order
+        self.pos=0          # ... of which batch[:pos] have been handled
+        self.batch_x=None   # largest float x in the batch
+
+    # Every vertex, once run() is done
+    @property
+    def intersections(self):
+        return self.point_to_segments.keys()
+
+    # Tree order of segments i and j: by y at the sweep position; equal there,
+    # the smaller slope is below just after it, then the smaller point index
+    def below(self,i,j):
+        segs=self.segs
+        li,lj=segs.line(i),segs.line(j)
+        if SweepLine.vertex is None:
+            c=compare_y(li,lj,SweepLine.x)
         else:
-            s0=min(combo,key=lambda s:(s.get_y(SweepLine.x),s.index))
-            s00=max(combo,key=lambda s:(s.get_y(SweepLine.x),s.index))
-            n0=self.node_map[s0]; n1=self.node_map[s00]
-            cur = n0.prev
-            while cur:
-                # Check if they intersect at the current sweep line x (optional but helps terminate early)
-                if not self.check_intersection(cur.seg, s0):  # You can use a custom function or bounding box overlap
-                    break
-                cur = cur.prev
-
-            # Traverse downwards to check intersections
-            cur = n1.next
-            while cur:
-                # Check if they intersect at the current sweep line x (optional but helps terminate early)
-                if not self.check_intersection(cur.seg, s00):  # You can use a custom function or bounding box overlap
-                    break
-                cur = cur.next
-    def check_intersection(self,s1,s2):
-        if not s1 or not s2 or s1.index==s2.index: return
-        # print(f"Checking intersection between {s1.index} and {s2.index}")
-        inter=s1.geom.intersection(s2.geom)
-        if inter.is_empty: return
-        pts=[inter] if inter.geom_type=='Point' else (inter.geoms if hasattr(inter,'geoms') else [])
-        for p in pts:
-            pt=(round(p.x,3),round(p.y,3))
-            if pt not in self.intersections:
-                self.intersections.add(pt)
-                self.add_intersection_event(p,s1,s2)
-            self.point_to_segments[pt].update([s1.index,s2.index])
-        if pts==[]:
-            return False
+            c=compare_y_at_vertex(li,lj,*SweepLine.vertex)
+        if c!=0: return c<0
+        if li[0]!=lj[0]: return li[0]<lj[0]
+        return segs.index[i]<segs.index[j]
+
+    # A vertex found inside the current batch's x window may come before
+    # events already in it, so it joins the batch; later ones are queued
+    def add_intersection_event(self,p,i,j):
+        e=(p[0],INTERSECT,p,i,j)
+        if self.batch is not None and not past(e[0],self.batch_x):
+            self.merge(e)
+        else:
+            heapq.heappush(self.events,e)
+
+    # Inserts e into the unhandled rest of the batch in exact order, then
+    # pulls in queued events that close to the batch's largest x, so every
+    # event left on the heap is truly later than the whole batch
+    def merge(self,e):
+        key=cmp_to_key(self.event_cmp)
+        while True:
+            insort(self.batch,e,lo=self.pos,key=key)
+            self.batch_x=max(self.batch_x,e[0])
+            if not self.events or past(self.events[0][0],self.batch_x):
+                return
+            e=heapq.heappop(self.events)
+
+    # Exact order of two events by x, then start < intersect < end
+    def event_cmp(self,e1,e2):
+        line=self.segs.line
+        if e1[1]==INTERSECT and e2[1]==INTERSECT:
+            c=compare_x(line(e1[3]),line(e1[4]),line(e2[3]),line(e2[4]))
+        elif e1[1]==INTERSECT:
+            c=compare_vertex_x(line(e1[3]),line(e1[4]),e2[0])
+        elif e2[1]==INTERSECT:
+            c=-compare_vertex_x(line(e2[3]),line(e2[4]),e1[0])
         else:
-            return True
+            c=(e1[0]>e2[0])-(e1[0]<e2[0])
+        if c!=0: return c
+        return e1[1]-e2[1]
+
+    # A start inserts its segment and checks it against both neighbours; an
+    # end removes it and checks the two segments it kept apart
+    def handle_endpoint(self,kind,i):
+        tree=self.tree
+        if kind==START:
+            tree.insert(i)
+            a,b=tree.prev[i],tree.next[i]
+            if a>=0: self.check_intersection(a,i)
+            if b>=0: self.check_intersection(i,b)
+        elif tree.live[i]:
+            a,b=tree.prev[i],tree.next[i]
+            tree.erase(i)
+            if a>=0 and b>=0: self.check_intersection(a,b)
+
+    # Vertex p, queued for segment i and one more. All k segments through p
+    # form one run of the status around i, found with an exact test per
+    # member and one on each side. Past p the run is ordered by slope, and
+    # identical segments by index (below()'s order at p), so it is sorted
+    # that way and relabelled into place at once. Then only its two new outer
+    # pairs are checked: O(k log k) per vertex, with no splays. p is done
+    # with: its run is recorded and the VertexTable stops matching it.
+    def handle_vertex(self,p,i,j):
+        segs,tree=self.segs,self.tree
+        self.queued.discard(p)
+        self.vertices.retire(p)
+        if not (tree.live[i] and tree.live[j]):
+            return  # stale: a segment of the pair has ended
+        line,vertex=segs.line(i),SweepLine.vertex
+        prev,next=tree.prev,tree.next
+        lo=hi=i
+        while prev[lo]>=0 and compare_y_at_vertex(segs.line(prev[lo]),line,*vertex)==0:
+            lo=prev[lo]
+        while next[hi]>=0 and compare_y_at_vertex(segs.line(next[hi]),line,*vertex)==0:
+            hi=next[hi]
+        run=[lo]
+        while run[-1]!=hi:
+            run.append(next[run[-1]])
+        if j not in run:
+            return  # stale: the pair does not meet in one run here
+        if self.metrics is not None:
+            self.metrics.degrees[len(run)]+=1
+            self.metrics.walks[len(run)-1+(prev[lo]>=0)+(next[hi]>=0)]+=1
+        m,index=segs.m,segs.index
+        self.point_to_segments[p]=tuple(sorted(index[c] for c in run))
+        order=sorted(run,key=lambda c: (m[c],index[c]))
+        tree.relabel(run,order)
+        a,b=prev[order[0]],next[order[-1]]
+        if a>=0: self.check_intersection(a,order[0])
+        if b>=0: self.check_intersection(order[-1],b)
+    def check_intersection(self,i,j):
+        segs=self.segs
+        if segs.index[i]==segs.index[j]: return
+        p=segment_intersection(segs,i,j)
+        if self.metrics is not None:
+            self.metrics.checks+=1
+            self.metrics.hits+=p is not None
+        if p is None: return False
+        # Only a vertex ahead of the current event is new. The sweep has passed
+        # one behind it, and one at the same x unless this is a start: vertex
+        # events at an x come after the starts there and before the ends.
+        l1,l2=segs.line(i),segs.line(j)
+        if SweepLine.vertex is None:
+            c=compare_vertex_x(l1,l2,SweepLine.x)
+        else:
+            c=compare_x(l1,l2,*SweepLine.vertex)
+        if c<0 or (c==0 and self.kind!=START): return False
+        pt=self.vertices.lookup(l1,l2,p)
+        if pt not in self.queued:
+            if self.metrics is not None:
+                self.metrics.new_vertices+=1
+            self.queued.add(pt)
+            self.add_intersection_event(pt,i,j)
+        return True
     def run(self):
+        segs=self.segs
         while self.events:
             e=heapq.heappop(self.events)
-            SweepLine.x=e.x
-            batch=[e]
-            while self.events and dcmp(self.events[0].x-e.x)==0:
-                batch.append(heapq.heappop(self.events))
-            batch.sort(key=lambda ev:(ev.x,{'start':0,'intersect':1,'end':2}[ev.type]))
-            for ev in batch:
-                SweepLine.x=ev.x+20*EPS
-                self.handle_event(ev.point,ev.segments)
-        return sorted(self.intersections)
+            self.batch,self.pos,self.batch_x=[],0,e[0]
+            self.merge(e)
+            while self.pos<len(self.batch):
+                x,kind,p,i,j=self.batch[self.pos]
+                self.pos+=1
+                if self.metrics is not None:
+                    self.metrics.events[EVENT_TYPES[kind]]+=1
+                SweepLine.x=x
+                self.kind=kind
+                if kind==INTERSECT:
+                    SweepLine.vertex=(segs.line(i),segs.line(j))
+                    self.handle_vertex(p,i,j)
+                else:
+                    SweepLine.vertex=None
+                    self.handle_endpoint(kind,i)
+            if self.metrics is not None:
+                self.metrics.batches[len(self.batch)]+=1
+        self.batch=None
+
+# Segments from clipped dual lines: segs holds x1 y1 x2 y2 rows, lines the
+# matching (slope, intercept) rows and idx the point index of each line
+def build_segments(segs, lines, idx):
+    keep = segs[:, 0] != segs[:, 2]
+    return Segments(segs[keep], lines[keep], idx[keep])
 
+def sweep(segments,metrics=None):
+    sl=SweepLine(segments,metrics)
+    sl.run()
+    return sl
 
+# Vertex with the most segments through it, and those segment indices; of
+# tied vertices, the first the sweep passed
+def largest_vertex(sl):
+    max_pt=None
+    max_segs=set()
+    for pt,segs_set in sl.point_to_segments.items():
+        if len(segs_set)>len(max_segs):
+            max_pt, max_segs = pt, segs_set
+    return max_pt, max_segs
+
+# Past a few hundred segments the lines are drawn as one collection, dense
+# layers are rasterised and the per-segment labels are left out; see
+# common/plotting.py
 def plot_segments_and_intersections(segments, intersections, segments_file, output_file, points_file):
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))  # Slightly wider
+    import matplotlib.pyplot as plt
 
-    with open(points_file, 'r') as f:
-        lines = f.read().strip().split()
-        k = int(lines[0])
-        pts = [tuple(map(float, lines[i * 2 + 1:i * 2 + 3])) for i in range(k)]
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))  # Slightly wider
 
-    cmap = cm.get_cmap("tab10", len(segments))
+    pts = read_points(points_file)
+    colors = palette(len(segments))
 
     # Plot input points with colors from the color map
-    for i, pt in enumerate(pts):
-        color = cmap(i % len(segments))  # Get color from the colormap
-        ax1.plot(pt[0], pt[1], 'o', color=color, label=f"{pt}")
+    if len(pts) <= LABEL_LIMIT:
+        for i, pt in enumerate(map(tuple, pts.tolist())):
+            ax1.plot(pt[0], pt[1], 'o', color=colors[i % len(colors)], label=f"{pt}")
+        ax1.legend()
+    else:
+        add_points(ax1, pts, colors[np.arange(len(pts)) % len(colors)])
 
-    # Add title, grid, legend, and equal aspect ratio
+    # Add title, grid and equal aspect ratio
     ax1.set_title("Input points")
     ax1.set_aspect('equal')
     ax1.grid(True)
-    ax1.legend()
 
     # --------- RIGHT PLOT: Segments and Intersections ---------
-    all_x, all_y = [], []
-
-    for idx, (p1, p2, segment_idx) in enumerate(segments):
-        xs, ys = zip(p1, p2)
-        all_x.extend(xs)
-        all_y.extend(ys)
-        ax2.plot(xs, ys, color=cmap(idx))
+    lines = np.array([(p1, p2) for p1, p2, _ in segments], dtype=np.float64).reshape(-1, 2, 2)
+    add_lines(ax2, lines, colors[:len(lines)])
+    all_xy = lines.reshape(-1, 2)
 
     if intersections:
-        ix, iy = zip(*intersections)
-        all_x.extend(ix)
-        all_y.extend(iy)
-        ax2.plot(ix, iy, 'ro', label='Intersections')
+        ixy = np.array(list(intersections), dtype=np.float64)
+        add_points(ax2, ixy, 'red', 'Intersections')
+        all_xy = np.vstack((all_xy, ixy))
 
     # Extend x-axis and y-axis range by a margin
-    x_margin = (max(all_x) - min(all_x)) * 0.2  # 20% extra width
-    y_margin = (max(all_y) - min(all_y)) * 0.1  # 10% extra height
-    ax2.set_xlim(min(all_x) - x_margin, max(all_x) + x_margin)
-    ax2.set_ylim(min(all_y) - y_margin, max(all_y) + y_margin)
+    if len(all_xy):
+        (min_x, min_y), (max_x, max_y) = all_xy.min(axis=0), all_xy.max(axis=0)
+        x_margin = (max_x - min_x) * 0.2  # 20% extra width
+        y_margin = (max_y - min_y) * 0.1  # 10% extra height
+        ax2.set_xlim(min_x - x_margin, max_x + x_margin)
+        ax2.set_ylim(min_y - y_margin, max_y + y_margin)
 
     ax2.set_title("Segments and Intersections")
     ax2.set_aspect('auto')  # Let it stretch horizontally
     ax2.grid(True)
 
-    for idx, (p1, p2, segment_idx) in enumerate(segments):
-        ax2.text(1.02, 0.98 - idx * 0.05, f"Segment {segment_idx}", 
-                 transform=ax2.transAxes, fontsize=10, color=cmap(idx),
-                 ha='left', va='top')
+    if len(segments) <= LABEL_LIMIT:
+        for idx, (p1, p2, segment_idx) in enumerate(segments):
+            ax2.text(1.02, 0.98 - idx * 0.05, f"Segment {segment_idx}",
+                     transform=ax2.transAxes, fontsize=10, color=colors[idx],
+                     ha='left', va='top')
 
-    ax2.legend()
+    if intersections:
+        ax2.legend()
 
     # Save the combined plot
     image_filename = f"segments_intersections_{segments_file.split('.')[0]}_{output_file.split('.')[0]}.png"
     plt.tight_layout()
-    plt.savefig(image_filename)
+    fig.savefig(image_filename)
     print(f"Plot saved as {image_filename}")
 
 if __name__=='__main__':
+    flags=pop_flags(sys.argv,'--no-plot','--timing')
+    metrics_file=pop_option(sys.argv,'--metrics')
+    metrics=SweepMetrics() if metrics_file else None
+    timer=PhaseTimer(T0)
+    timer.mark('startup')
     if len(sys.argv)!=4:
-        print("Usage: python3 q1.py segs.txt out.txt pts.txt")
+        print("Usage: python3 q1.py [--no-plot] [--timing] [--metrics FILE|-] segs.txt out.txt pts.txt")
         sys.exit(1)
     input_file, output_file, points_file = sys.argv[1], sys.argv[2], sys.argv[3]
-    # Read segments
+    pts=[tuple(pt) for pt in read_points(points_file).tolist()]
+    # Read segments; segment i is the dual line y = x_i*x - y_i of point i
     with open(input_file,'r') as f:
         n=int(f.readline())
-        segs=[]
+        rows,lines,index=[],[],[]
         for i in range(n):
             x1,y1,x2,y2=map(float,f.readline().split())
-            if dcmp(x1-x2)!=0:
-                segs.append(Segment((x1,y1),(x2,y2),i))
+            if x1!=x2:
+                rows.append((x1,y1,x2,y2))
+                lines.append((pts[i][0],-pts[i][1]) if i<len(pts) else (np.nan,np.nan))
+                index.append(i)
+        segs=Segments(rows,lines,index)
+    timer.mark('read')
     # Run sweep
-    sl=SweepLine()
-    for s in segs:
-        sl.add_segment(s)
-    result=sl.run()
+    sl=sweep(segs,metrics)
+    result=sorted(sl.intersections)
+    timer.mark('sweep')
     # Write intersections
     with open(output_file,'w') as f:
         f.write("Unique intersection points:\n")
         for x,y in result:
-            f.write(f"({x:.3f}, {y:.3f})\n")
+            f.write(f"({round(x,3)+0.0:.3f}, {round(y,3)+0.0:.3f})\n")
 
     # Process points file for largest collinear subs
-    max_pt=None
-    max_segs=set()
-    for pt,segs_set in sl.point_to_segments.items():
-        # print(segs_set,pt)
-        if len(segs_set)>len(max_segs):
-            max_pt, max_segs = pt, segs_set
-    with open(points_file,'r') as f:
-        lines=f.read().strip().split() 
-        k=int(lines[0])
-        pts=[tuple(map(float,lines[i*2+1:i*2+3])) for i in range(k)]
+    max_pt, max_segs = largest_vertex(sl)
     if max_pt:
         print("Largest subset of points that lie on a common line ::")
         for idx in sorted(max_segs):
@@ -314,5 +528,17 @@ if __name__=='__main__':
             print(f"{x}, {y}")
     else:
         print("No segment intersections found.")
-    
-    plot_segments_and_intersections([(s.p1, s.p2, s.index) for s in segs], result, input_file, output_file, points_file)
\ No newline at end of file
+    timer.mark('output')
+
+    # The plot phase is reported even if drawing or saving the figure fails
+    try:
+        if '--no-plot' not in flags:
+            plot_segments_and_intersections(list(segs), result, input_file, output_file, points_file)
+    finally:
+        if '--no-plot' not in flags:
+            timer.mark('plot')
+        if '--timing' in flags:
+            timer.report()
+        if metrics is not None:
+            metrics.phases.update(timer.as_dict())
+            metrics.dump(metrics_file)
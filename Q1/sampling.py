@@ -0,0 +1,93 @@
+import time
+T0 = time.perf_counter()
+import os
+import sys
+import math
+import numpy as np
+from predicates import orient_many
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.pointio import read_points
+from common.cli import pop_flags, pop_option
+from common.timing import PhaseTimer
+from main import find_max_collinear
+
+# Randomized max-collinear search for inputs with a heavy line.
+#
+# A line holding m of the n points contains a uniformly random pair with
+# probability p(m) = m(m-1) / (n(n-1)), so after t random pairs it has been
+# missed with probability at most (1 - p(m))^t <= exp(-t p(m)). Each sampled
+# pair's line is counted exactly with one vectorised orient_many pass, O(n).
+# Once the best line so far has m points and t >= ln(1/delta) / p(m + 1), a
+# line with more points would have been sampled with probability 1 - delta,
+# so the search stops. If that has not happened by the time a line of
+# eps * n points would have been certified, there is no heavy line and the
+# exact engine runs instead. With a heavy line this is O(n log(1/delta) / eps²).
+
+def _pair_prob(m, n):
+    return m * (m - 1) / (n * (n - 1))
+
+# Sorted indices of a max collinear subset, correct with probability at least
+# 1 - delta when some line holds eps * n points or more. stats, if given, is
+# filled with the number of sampled pairs and whether the exact engine ran.
+def sample_max_collinear(pts, eps=0.1, delta=1e-3, seed=None, fallback=True, stats=None):
+    pts = np.asarray(pts, dtype=np.float64).reshape(-1, 2)
+    n = len(pts)
+    stats = {} if stats is None else stats
+    stats.update(trials=0, fallback=False)
+    if n < 3:
+        return find_max_collinear(pts)[1]
+
+    log_inv = math.log(1 / delta)
+    heavy = max(3, math.ceil(eps * n))
+    budget = math.ceil(log_inv / _pair_prob(heavy, n))
+    rng = np.random.default_rng(seed)
+    best = np.empty(0, dtype=np.intp)
+    on_best = np.zeros(n, dtype=bool)
+
+    t = 0
+    while t < budget:
+        for i, j in rng.integers(n, size=(min(1024, budget - t), 2)).tolist():
+            t += 1
+            if pts[i, 0] == pts[j, 0] or (on_best[i] and on_best[j]):
+                continue  # vertical (or repeated) pair, or the best line again
+            line = np.flatnonzero(orient_many(pts, np.broadcast_to(pts[j], (n, 2)), pts[i]) == 0)
+            if len(line) > len(best):
+                best = line
+                on_best[:] = False
+                on_best[best] = True
+            m = len(best)
+            if m == n or t >= log_inv / _pair_prob(m + 1, n):
+                stats['trials'] = t
+                return best
+    stats['trials'] = t
+
+    if not fallback:
+        return best
+    stats['fallback'] = True
+    return find_max_collinear(pts)[1]
+
+if __name__ == "__main__":
+    flags = pop_flags(sys.argv, '--timing')
+    eps = pop_option(sys.argv, '--eps', 0.1, float)
+    delta = pop_option(sys.argv, '--delta', 1e-3, float)
+    seed = pop_option(sys.argv, '--seed', None, int)
+    timer = PhaseTimer(T0)
+    timer.mark('startup')
+    if len(sys.argv) != 2:
+        print("Usage: python3 sampling.py [--eps E] [--delta D] [--seed S] [--timing] <points file>")
+        sys.exit(1)
+
+    points = read_points(sys.argv[1])
+    timer.mark('read')
+    stats = {}
+    best = sample_max_collinear(points, eps, delta, seed, stats=stats)
+    timer.mark('compute')
+
+    print("\nMax subset of collinear points:")
+    for pt in points[best].tolist():
+        print(tuple(pt))
+    how = "exact fallback" if stats['fallback'] else "sampled"
+    print(f"({how}, {stats['trials']} pairs)", file=sys.stderr)
+    timer.mark('output')
+    if '--timing' in flags:
+        timer.report()
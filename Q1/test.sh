@@ -1,11 +1,6 @@
 #!/bin/bash
-
-for i in {1..10}
-do
-    echo "========================="
-    echo "Running test$i.txt"
-    echo "========================="
-    python3 dual.py "test$i.txt"
-    echo
-    python3 q1.py "segs$i.txt" "out$i.txt" "test$i.txt"
-done
+# Runs every test*.txt through the in-process sweep pipeline in one batch
+# process and prints one JSON line per file. dual.py and q1.py still write
+# the segs*.txt / out*.txt files and plots for a single input.
+cd "$(dirname "$0")"
+python3 ../batch.py --engine sweep --pattern 'test*.txt' . "$@"
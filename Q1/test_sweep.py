@@ -0,0 +1,64 @@
+import os
+import sys
+from collections import defaultdict
+from fractions import Fraction
+from itertools import combinations
+import numpy as np
+import pytest
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pipeline import max_collinear
+from dual import dual_lines, bounding_box, clip_lines
+from q1 import build_segments, sweep
+from bench.generators import generate
+
+# The sweep against exact brute force: the size of the max collinear subset
+# (non-vertical lines only, as every engine reports), and every vertex of the
+# dual arrangement with the full set of lines through it.
+
+def brute_size(points):
+    P = [(Fraction(x), Fraction(y)) for x, y in points]
+    best = 0
+    for (x1, y1), (x2, y2) in combinations(P, 2):
+        if x1 != x2:
+            best = max(best, sum((x2 - x1) * (y - y1) == (y2 - y1) * (x - x1) for x, y in P))
+    return best
+
+def brute_vertices(duals):
+    L = [(Fraction(a), Fraction(b)) for a, b in duals.tolist()]
+    vert = defaultdict(set)
+    for i, j in combinations(range(len(L)), 2):
+        (a1, b1), (a2, b2) = L[i], L[j]
+        if a1 != a2:
+            x = (b2 - b1) / (a1 - a2)
+            vert[(x, a1 * x + b1)].update((i, j))
+    return sorted(sorted(v) for v in vert.values())
+
+def test_repeated_points():
+    pts = [[0.3, -0.1], [-0.3, -0.1], [0.3, -0.1], [0.1, 0], [0.2, -0.1], [0.3, -0.2]]
+    assert sorted(max_collinear(pts).tolist()) == [0, 1, 2, 4]
+
+@pytest.mark.parametrize('seed', range(3))
+def test_random_small(seed):
+    rng = np.random.default_rng(seed)
+    for t in range(100):
+        n = int(rng.integers(3, 12))
+        if t % 2:
+            pts = np.round(rng.integers(-3, 4, size=(n, 2)) / 10, 1)
+        else:
+            pts = rng.integers(-4, 5, size=(n, 2)).astype(float)
+        want = brute_size(pts.tolist())
+        if want >= 2:
+            assert len(max_collinear(pts)) == want, pts.tolist()
+
+@pytest.mark.parametrize('workload', ['grid', 'planted', 'clusters', 'uniform'])
+def test_vertices(workload):
+    for seed in range(3):
+        pts = generate(workload, 35, seed)
+        if seed % 2:
+            pts = np.vstack([pts, pts[:3]])  # repeated points
+        duals = dual_lines(pts)
+        segs, idx = clip_lines(duals, bounding_box(duals))
+        sl = sweep(build_segments(segs, duals[idx], idx))
+        got = sorted(sorted(v) for v in sl.point_to_segments.values() if len(v) >= 2)
+        assert got == brute_vertices(duals)
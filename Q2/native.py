@@ -0,0 +1,130 @@
+import time
+T0 = time.perf_counter()
+import os
+import sys
+import hashlib
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.pointio import read_points
+from common.cli import pop_flags, pop_option
+from common.cache import ResultCache, DEFAULT_DIR
+from common.timing import PhaseTimer
+
+# Python front end for q2.cpp: builds the binary once per source version and
+# runs it on a point array, optionally through the result cache.
+
+SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'q2.cpp')
+
+# Path of the compiled q2.cpp, built with -O2 on first use. The binary name
+# carries a hash of the source, so an edited q2.cpp gets a fresh build and
+# processes building at the same time each rename a complete file into place.
+def build_binary(build_dir=None):
+    build_dir = build_dir or os.path.join(os.environ.get('Q8_CACHE_DIR') or DEFAULT_DIR, 'bin')
+    with open(SOURCE, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:16]
+    binary = os.path.join(build_dir, f'q2-{digest}')
+    if not os.path.exists(binary):
+        os.makedirs(build_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=build_dir)
+        os.close(fd)
+        try:
+            subprocess.run(['g++', '-O2', '-o', tmp, SOURCE], check=True)
+            os.replace(tmp, binary)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+    return binary
+
+# Output rows of cmd run on the points, `width` numbers each
+def _call(points, cmd, width):
+    text = f"{len(points)}\n" + "".join(f"{x!r} {y!r}\n" for x, y in points.tolist())
+    out = subprocess.run(cmd, input=text, capture_output=True, text=True, check=True).stdout
+    return np.array(out.split(), dtype=np.float64).reshape(-1, width)
+
+def _run(points, binary, kinetic):
+    return _call(points, [binary] + (['--kinetic'] if kinetic else []), 2)[:3]
+
+# Corners of the min-area triangle as a (3, 2) array, as printed by q2.cpp
+def min_area_triangle(points, kinetic=False, cache=None, binary=None):
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    binary = binary or build_binary()
+    if cache is None:
+        return _run(points, binary, kinetic)
+    return cache.cached(points, 'q2.cpp', lambda: {'triangle': _run(points, binary, kinetic)},
+                        kinetic=kinetic)['triangle']
+
+# Slab boundaries on the dual x axis with about as many vertices in each slab.
+# The vertex of the duals of two points lies at x = their slope, so the
+# boundaries are quantiles of the slopes of up to `sample` random pairs.
+def slab_bounds(points, slabs, sample=100000, seed=0):
+    rng = np.random.default_rng(seed)
+    i = rng.integers(len(points), size=sample)
+    j = rng.integers(len(points), size=sample)
+    dx = points[i, 0] - points[j, 0]
+    dy = points[i, 1] - points[j, 1]
+    slopes = dy[dx != 0] / dx[dx != 0]
+    inner = np.unique(np.quantile(slopes, np.arange(1, slabs) / slabs)).tolist() if len(slopes) else []
+    return [-np.inf, *inner, np.inf]
+
+# Min-area triangle from the kinetic sweep split into slabs of the dual x axis.
+# Each slab runs in its own q2.cpp process, which sorts the lines at the left
+# boundary and sweeps only the vertices inside; the smallest slab result wins
+# (the leftmost on ties, as in one sweep). Returns corners as a (3, 2) array.
+def slab_min_area_triangle(points, workers=None, slabs=None, binary=None):
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    binary = binary or build_binary()
+    workers = workers or os.cpu_count()
+    bounds = slab_bounds(points, slabs or workers)
+
+    def run(k):
+        return _call(points, [binary, '--slab', repr(bounds[k]), repr(bounds[k + 1])], 7)
+    with ThreadPoolExecutor(workers) as pool:
+        rows = np.concatenate(list(pool.map(run, range(len(bounds) - 1))))
+    if not len(rows):
+        return np.zeros((3, 2))  # fewer than three points, as q2.cpp prints
+    return rows[np.argmin(rows[:, 0]), 1:].reshape(3, 2)
+
+# The k smallest triangles and/or those with area below `below`, smallest
+# first, as (areas, corners) with corners of shape (m, 3, 2)
+def smallest_triangles(points, k=None, below=None, binary=None):
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    cmd = [binary or build_binary()]
+    if k is not None:
+        cmd += ['--smallest', str(int(k))]
+    if below is not None:
+        cmd += ['--below', repr(float(below))]
+    if len(cmd) == 1:
+        raise ValueError("give k, below or both")
+    rows = _call(points, cmd, 7)
+    return rows[:, 0], rows[:, 1:].reshape(-1, 3, 2)
+
+if __name__ == "__main__":
+    flags = pop_flags(sys.argv, '--kinetic', '--cache', '--timing')
+    workers = pop_option(sys.argv, '--workers', type=int)
+    timer = PhaseTimer(T0)
+    timer.mark('startup')
+    if len(sys.argv) != 2:
+        print("Usage: python3 native.py [--kinetic] [--cache] [--timing] [--workers W] <points file>")
+        sys.exit(1)
+
+    points = read_points(sys.argv[1])
+    timer.mark('read')
+    cache = ResultCache() if '--cache' in flags else None
+    if workers is not None:
+        if cache is None:
+            triangle = slab_min_area_triangle(points, workers or None)
+        else:
+            # Same result as the kinetic sweep, so it shares its cache entries
+            triangle = cache.cached(points, 'q2.cpp', lambda: {'triangle': slab_min_area_triangle(points, workers or None)},
+                                    kinetic=True)['triangle']
+    else:
+        triangle = min_area_triangle(points, '--kinetic' in flags, cache)
+    timer.mark('compute')
+    for x, y in triangle.tolist():
+        print(f"{x:.10f} {y:.10f}")
+    timer.mark('output')
+    if '--timing' in flags:
+        timer.report()
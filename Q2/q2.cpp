@@ -1,16 +1,75 @@
 #include <bits/stdc++.h>
 using namespace std;
 
-const double EPS = 1e-9;
+// Filtered predicates. Each one is the sign of
+//     (p - q) * (r - s) - (t - u) * (v - w),
+// evaluated in doubles and trusted when |det| > (3 + 16u) u (|left| + |right|)
+// (Shewchuk's orient2d bound). Otherwise it is recomputed exactly as a sum of
+// error-free products (expansion arithmetic).
+const double U = numeric_limits<double>::epsilon() / 2;
+const double DET_BOUND = (3.0 + 16.0 * U) * U;
+
+inline int sgn(double v) { return (v > 0) - (v < 0); }
+
+inline void twoSum(double a, double b, double& s, double& e) {
+    s = a + b;
+    double bv = s - a, av = s - bv;
+    e = (a - av) + (b - bv);
+}
+
+inline void twoProduct(double a, double b, double& p, double& e) {
+    p = a * b;
+    e = fma(a, b, -p);
+}
+
+// Adds b to a nonoverlapping expansion, dropping zero components
+void growExpansion(vector<double>& e, double b) {
+    vector<double> h;
+    double q = b;
+    for (double x : e) {
+        double s, err;
+        twoSum(q, x, s, err);
+        if (err != 0) h.push_back(err);
+        q = s;
+    }
+    if (q != 0) h.push_back(q);
+    e.swap(h);
+}
+
+int det2(double p, double q, double r, double s,
+         double t, double u, double v, double w) {
+    double left = (p - q) * (r - s);
+    double right = (t - u) * (v - w);
+    double det = left - right;
+    if (fabs(det) > DET_BOUND * (fabs(left) + fabs(right))) return sgn(det);
+    if ((p == q || r == s) && (t == u || v == w)) return 0;  // both products are exactly zero
+
+    double d[4][2];
+    twoSum(p, -q, d[0][0], d[0][1]);
+    twoSum(r, -s, d[1][0], d[1][1]);
+    twoSum(t, -u, d[2][0], d[2][1]);
+    twoSum(v, -w, d[3][0], d[3][1]);
+    vector<double> sum;
+    for (int side = 0; side < 2; ++side)
+        for (double a : d[2 * side])
+            for (double b : d[2 * side + 1]) {
+                double pr, er;
+                twoProduct(a, b, pr, er);
+                growExpansion(sum, side ? -pr : pr);
+                growExpansion(sum, side ? -er : er);
+            }
+    return sum.empty() ? 0 : sgn(sum.back());  // largest component decides
+}
 
 struct Point {
     double x, y;
-    bool operator<(const Point& other) const {
-        if (fabs(x - other.x) < EPS) return y < other.y;
-        return x < other.x;
-    }
 };
 
+// +1 counter-clockwise, -1 clockwise, 0 collinear
+int orient(const Point& a, const Point& b, const Point& c) {
+    return det2(a.x, c.x, b.y, c.y, a.y, c.y, b.x, c.x);
+}
+
 struct Line {
     double a, b;
     int id;
@@ -20,7 +79,41 @@ struct Line {
     }
 
     bool operator==(const Line& other) const {
-        return fabs(a - other.a) < EPS && fabs(b - other.b) < EPS;
+        return a == other.a && b == other.b;
+    }
+};
+
+// Sign of x(l1 & l2) - x(l3 & l4); each pair must not be parallel
+int compareX(const Line& l1, const Line& l2, const Line& l3, const Line& l4) {
+    return det2(l2.b, l1.b, l3.a, l4.a, l4.b, l3.b, l1.a, l2.a) *
+           sgn(l1.a - l2.a) * sgn(l3.a - l4.a);
+}
+
+// Sign of y_i - y_j at x
+int compareYAt(const Line& li, const Line& lj, double x) {
+    return det2(li.a, lj.a, x, 0, lj.b, li.b, 1, 0);
+}
+
+// Sign of x(l1 & l2) - x; the lines must not be parallel
+int compareVertexX(const Line& l1, const Line& l2, double x) {
+    return det2(l2.b, l1.b, 1, 0, l1.a, l2.a, x, 0) * sgn(l1.a - l2.a);
+}
+
+// Sign of y_i - y_j at the vertex l1 & l2
+int compareYAtVertex(const Line& li, const Line& lj, const Line& l1, const Line& l2) {
+    return det2(li.a, lj.a, l2.b, l1.b, lj.b, li.b, l1.a, l2.a) * sgn(l1.a - l2.a);
+}
+
+// Exact sweep order of two dual vertices: by x, then y, then line ids
+struct EventLess {
+    const vector<Line>& lines;
+    bool operator()(const pair<int, int>& e, const pair<int, int>& f) const {
+        const Line &l1 = lines[e.first], &l2 = lines[e.second];
+        const Line &l3 = lines[f.first], &l4 = lines[f.second];
+        int c = compareX(l1, l2, l3, l4);
+        if (c == 0) c = compareYAtVertex(l1, l3, l1, l2);
+        if (c != 0) return c < 0;
+        return e < f;
     }
 };
 
@@ -128,38 +221,68 @@ public:
     }
 };
 
-int main() {
-    int n;
-    cin >> n;
-    vector<Point> pts(n);
-    for (auto& p : pts) cin >> p.x >> p.y;
+// Smallest non-degenerate triangle seen so far
+struct Best {
+    double area = DBL_MAX;
+    tuple<Point, Point, Point> triangle;
+
+    void consider(const Point& p1, const Point& p2, const Point& p3) {
+        if (orient(p1, p2, p3) == 0) return;  // degenerate triangle
+        double a = triangleArea(p1, p2, p3);
+        if (a < area) {
+            area = a;
+            triangle = {p1, p2, p3};
+        }
+    }
+};
 
-    vector<Line> lines;
-    for (int i = 0; i < n; ++i)
-        lines.push_back({pts[i].x, -pts[i].y, i});
+// The k smallest triangles (k = 0: no limit) with area below a threshold, as
+// (area, a, b, c) with a < b < c in a max-heap, so the largest is dropped first
+struct TriangleHeap {
+    size_t k = 0;
+    double below = DBL_MAX;
+    vector<tuple<double, int, int, int>> heap;
+
+    // Triangles need a smaller area than this to get in
+    double bound() const {
+        return k && heap.size() == k ? min(below, get<0>(heap.front())) : below;
+    }
+
+    void add(double area, int a, int b, int c) {
+        if (!(area < bound())) return;
+        heap.push_back({area, a, b, c});
+        push_heap(heap.begin(), heap.end());
+        if (k && heap.size() > k) {
+            pop_heap(heap.begin(), heap.end());
+            heap.pop_back();
+        }
+    }
+};
 
-    set<pair<Point, pair<int, int>>> xEvents;
+// Order at x = -infinity: larger slope is lower, parallel lines by intercept
+bool initialLess(const Line& l1, const Line& l2) {
+    if (l1.a != l2.a) return l1.a > l2.a;
+    return l1.b < l2.b;
+}
+
+// Sweeps all n^2 vertices, sorted up front
+void fullSweep(const vector<Point>& pts, const vector<Line>& lines, Best& best) {
+    int n = lines.size();
+    vector<pair<int, int>> xEvents;
     for (int i = 0; i < n; ++i)
         for (int j = i + 1; j < n; ++j)
-            if (fabs(lines[i].a - lines[j].a) > EPS) {
-                Point intersection = getIntersection(lines[i], lines[j]);
-                xEvents.insert({intersection, {i, j}});
-            }
+            if (lines[i].a != lines[j].a)
+                xEvents.push_back({i, j});
+    sort(xEvents.begin(), xEvents.end(), EventLess{lines});
 
     vector<Line> sortedLines = lines;
-    sort(sortedLines.begin(), sortedLines.end(), [&](const Line& l1, const Line& l2) {
-        return l1.getY(-1e9) < l2.getY(-1e9);
-    });
+    sort(sortedLines.begin(), sortedLines.end(), initialLess);
 
     LinkedList status;
     status.build(sortedLines);
 
-    double minArea = DBL_MAX;
-    tuple<Point, Point, Point> bestTriangle;
-
     for (auto& event : xEvents) {
-        Point X = event.first;
-        int i = event.second.first, j = event.second.second;
+        int i = event.first, j = event.second;
 
         // Swap lines
         status.swapNodes(i, j);
@@ -170,21 +293,217 @@ int main() {
             for (int otherId : {aboveId, belowId}) {
                 if (otherId == -1) continue;
                 if (!isDistinct(i, j, otherId)) continue;
+                best.consider(pts[i], pts[j], pts[otherId]);
+            }
+        }
+    }
+}
+
+// Kinetic sweep: only vertices of lines that are adjacent in the current order
+// are queued, at most one per line (with the line above it), so memory is O(n).
+// order/where make swaps and position checks O(1). The lines through a vertex
+// are contiguous in the order; passing the vertex reverses that block, and the
+// lines just outside it are the third-point candidates for every pair inside.
+//
+// A slab [left, right) only sweeps the vertices with left <= x < right. It
+// starts from the order just left of `left`, sorted exactly, which is the
+// order the whole sweep would have there, so the slabs of a partition of the
+// x axis together see every vertex exactly as one sweep does.
+class KineticSweep {
+public:
+    using EventSet = set<pair<int, int>, EventLess>;
+
+    KineticSweep(const vector<Point>& pts, const vector<Line>& lines,
+                 double left = -INFINITY, double right = INFINITY)
+        : pts(pts), lines(lines), events(EventLess{lines}),
+          pending(lines.size(), events.end()), where(lines.size()), right(right) {
+        order.resize(lines.size());
+        iota(order.begin(), order.end(), 0);
+        stable_sort(order.begin(), order.end(), [&](int i, int j) {
+            const Line &li = lines[i], &lj = lines[j];
+            if (left != -INFINITY) {
+                int c = compareYAt(li, lj, left);
+                if (c != 0) return c < 0;
+                // Through one point at left: the larger slope is lower just before it
+                if (li.a != lj.a) return li.a > lj.a;
+            }
+            return initialLess(li, lj);
+        });
+        for (int k = 0; k < (int)order.size(); ++k) where[order[k]] = k;
+        for (int k = 0; k + 1 < (int)order.size(); ++k) schedule(k);
+    }
+
+    // With found set, every pair at a vertex also walks outward in the order
+    // to feed it (see walkPair)
+    void run(Best& best, TriangleHeap* found = nullptr) {
+        while (!events.empty()) {
+            auto [i, j] = *events.begin();
+            const Line &l1 = lines[i], &l2 = lines[j];
+            int lo = where[i], hi = where[j];
+            while (lo > 0 && concurrent(l1, l2, lines[order[lo - 1]])) --lo;
+            while (hi + 1 < (int)order.size() && concurrent(l1, l2, lines[order[hi + 1]])) ++hi;
+
+            vector<int> block(order.begin() + lo, order.begin() + hi + 1);
+            sort(block.begin(), block.end());
+            for (int a = 0; a < (int)block.size(); ++a)
+                for (int b = a + 1; b < (int)block.size(); ++b) {
+                    tryPair(block[a], block[b], lo, hi, best);
+                    if (found) walkPair(block[a], block[b], lo, hi, *found);
+                }
+
+            // Identical lines (repeated points) stay in id order, so the order
+            // at any x is the one a sort gives, which slabs start from
+            reverse(order.begin() + lo, order.begin() + hi + 1);
+            for (int k = lo, m; k <= hi; k = m) {
+                for (m = k + 1; m <= hi && lines[order[k]] == lines[order[m]]; ++m) {}
+                reverse(order.begin() + k, order.begin() + m);
+            }
+            for (int k = lo; k <= hi; ++k) {
+                where[order[k]] = k;
+                unschedule(order[k]);
+            }
+            if (lo > 0) schedule(lo - 1);
+            if (hi + 1 < (int)order.size()) schedule(hi);
+        }
+    }
+
+private:
+    const vector<Point>& pts;
+    const vector<Line>& lines;
+    EventSet events;
+    vector<EventSet::iterator> pending;
+    vector<int> order, where;
+    double right;
+
+    // Three lines through one point; l1 and l2 are not parallel
+    static bool concurrent(const Line& l1, const Line& l2, const Line& l3) {
+        return orient({l1.a, l1.b}, {l2.a, l2.b}, {l3.a, l3.b}) == 0;
+    }
+
+    void unschedule(int id) {
+        if (pending[id] == events.end()) return;
+        events.erase(pending[id]);
+        pending[id] = events.end();
+    }
+
+    // Queues the vertex of the lines at positions k and k + 1 if they still
+    // meet before the right end of the slab
+    void schedule(int k) {
+        int lo = order[k], hi = order[k + 1];
+        unschedule(lo);
+        if (lines[lo].a > lines[hi].a &&
+            (right == INFINITY || compareVertexX(lines[lo], lines[hi], right) < 0))
+            pending[lo] = events.insert({lo, hi}).first;
+    }
+
+    // Pair i < j of the block [lo, hi] with the lines just below and above it
+    // once the block is passed, nearest to i first as in the full sweep
+    void tryPair(int i, int j, int lo, int hi, Best& best) {
+        int below = lo > 0 ? order[lo - 1] : -1;
+        int above = hi + 1 < (int)order.size() ? order[hi + 1] : -1;
+        int nearBelow = hi - where[i];  // i moves to lo + hi - where[i]
+        if (nearBelow > where[i] - lo) swap(below, above);
+        for (int otherId : {below, above})
+            if (otherId != -1) best.consider(pts[i], pts[j], pts[otherId]);
+    }
+
+    // Every triangle is seen at the vertices of all its non-vertical sides;
+    // it is only recorded at its first one in id order
+    bool canonical(int i, int j, int r) const {
+        int t[3] = {i, j, r};
+        sort(t, t + 3);
+        int a = t[0], b = pts[t[0]].x != pts[t[1]].x ? t[1] : t[2];
+        return a == min(i, j) && b == max(i, j);
+    }
 
-                Point p1 = pts[i];
-                Point p2 = pts[j];
-                Point p3 = pts[otherId];
-                double area = triangleArea(p1, p2, p3);
-                if (area > 1e-6 && area < minArea) {
-                    minArea = area;
-                    bestTriangle = {p1, p2, p3};
+    // At the vertex of i and j the area of (i, j, r) is |x_i - x_j| / 2 times
+    // the vertical distance from the vertex to line r, so it grows as r moves
+    // away from the block [lo, hi] on either side; each side is walked until
+    // the area reaches the heap's bound
+    void walkPair(int i, int j, int lo, int hi, TriangleHeap& found) {
+        for (int step : {-1, 1}) {
+            for (int k = step < 0 ? lo - 1 : hi + 1; k >= 0 && k < (int)order.size(); k += step) {
+                int r = order[k];
+                if (orient(pts[i], pts[j], pts[r]) == 0) continue;
+                double area = triangleArea(pts[i], pts[j], pts[r]);
+                if (!(area < found.bound())) break;
+                if (canonical(i, j, r)) {
+                    int t[3] = {i, j, r};
+                    sort(t, t + 3);
+                    found.add(area, t[0], t[1], t[2]);
                 }
             }
         }
     }
+};
+
+int main(int argc, char** argv) {
+    bool kinetic = false;
+    TriangleHeap found;
+    bool query = false;
+    bool slab = false;
+    double left = -INFINITY, right = INFINITY;
+    for (int a = 1; a < argc; ++a) {
+        string arg = argv[a];
+        if (arg == "--kinetic") {
+            kinetic = true;
+        } else if (arg == "--slab" && a + 2 < argc) {
+            left = stod(argv[++a]);
+            right = stod(argv[++a]);
+            slab = true;
+        } else if (arg == "--smallest" && a + 1 < argc) {
+            found.k = stoul(argv[++a]);
+            query = true;
+        } else if (arg == "--below" && a + 1 < argc) {
+            found.below = stod(argv[++a]);
+            query = true;
+        } else {
+            cerr << "Usage: " << argv[0]
+                 << " [--kinetic] [--smallest K] [--below AREA] [--slab L R] < points\n";
+            return 1;
+        }
+    }
+
+    int n;
+    cin >> n;
+    vector<Point> pts(n);
+    for (auto& p : pts) cin >> p.x >> p.y;
 
-    auto [p1, p2, p3] = bestTriangle;
+    vector<Line> lines;
+    for (int i = 0; i < n; ++i)
+        lines.push_back({pts[i].x, -pts[i].y, i});
+
+    Best best;
     cout << fixed << setprecision(10);
+    if (query) {
+        // One triangle per line, smallest area first: area x1 y1 x2 y2 x3 y3
+        KineticSweep(pts, lines, left, right).run(best, &found);
+        sort_heap(found.heap.begin(), found.heap.end());
+        for (auto& [area, a, b, c] : found.heap) {
+            cout << area;
+            for (int id : {a, b, c}) cout << " " << pts[id].x << " " << pts[id].y;
+            cout << "\n";
+        }
+        return 0;
+    }
+
+    if (slab) {
+        // The slab's best as one line, area x1 y1 x2 y2 x3 y3; none if it has no triangle
+        KineticSweep(pts, lines, left, right).run(best);
+        if (best.area < DBL_MAX) {
+            auto [p1, p2, p3] = best.triangle;
+            // Full precision, so the reduction over slabs sees the exact order
+            cout << defaultfloat << setprecision(17) << best.area << fixed << setprecision(10);
+            for (const Point& p : {p1, p2, p3}) cout << " " << p.x << " " << p.y;
+            cout << "\n";
+        }
+        return 0;
+    }
+
+    if (kinetic) KineticSweep(pts, lines).run(best);
+    else fullSweep(pts, lines, best);
+
+    auto [p1, p2, p3] = best.triangle;
     cout << p1.x << " " << p1.y << "\n";
     cout << p2.x << " " << p2.y << "\n";
     cout << p3.x << " " << p3.y << "\n";
@@ -1,5 +1,12 @@
+import time
+T0 = time.perf_counter()
+import os
 import sys
-import matplotlib.pyplot as plt
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.pointio import read_points
+from common.cli import pop_flags
+from common.timing import PhaseTimer
 
 # Point class
 class Point:
@@ -7,36 +14,64 @@ class Point:
         self.x = x
         self.y = y
 
-# Read points from a file
-def read_points(filename, skip_first_line=False):
-    points = []
-    with open(filename, 'r') as f:
-        if skip_first_line:
-            f.readline()  # Skip the first line
-        for line in f:
-            if line.strip():
-                x, y = map(float, line.strip().split())
-                points.append(Point(x, y))
-    return points
-
 # Compute triangle area using determinant formula
 def triangle_area(p1, p2, p3):
     return abs((p1.x * (p2.y - p3.y) +
                 p2.x * (p3.y - p1.y) +
                 p3.x * (p1.y - p2.y)) / 2.0)
 
-# Generate all unique triangles from a list of points
-def brute_force_triangles(points):
-    triangles = []
-    n = len(points)
-    for i in range(n):
-        for j in range(i + 1, n):
-            for k in range(j + 1, n):
-                triangles.append([points[i], points[j], points[k]])
-    return triangles
+# Find all triangles with the smallest non-zero area without materialising
+# the C(n,3) triples: areas are computed over blocks of (j, k) pairs for each
+# i, so no more than about `chunk` areas are held at once. Ties follow the
+# old one-triple-at-a-time loop in (i, j, k) order: a strictly smaller area
+# restarts the list, and later areas within tol of the minimum join it. Only
+# the minimum, the tie count and the first `max_kept` tied triples are stored.
+def min_area_triangles(pts, chunk=1 << 20, max_kept=64, tol=1e-9):
+    pts = np.asarray(pts, dtype=np.float64).reshape(-1, 2)
+    n = len(pts)
+    x, y = pts[:, 0], pts[:, 1]
+
+    min_area = float('inf')
+    count = 0
+    kept = []
+
+    for i in range(n - 2):
+        rows = max(1, chunk // (n - i - 1))
+        for j0 in range(i + 1, n - 1, rows):
+            j = np.arange(j0, min(j0 + rows, n - 1))[:, None]
+            k = np.arange(j0 + 1, n)[None, :]
+            xj, yj, xk, yk = x[j], y[j], x[k], y[k]
+
+            # Same determinant as triangle_area, term for term
+            area = np.abs((x[i] * (yj - yk) +
+                           xj * (yk - y[i]) +
+                           xk * (y[i] - yj)) / 2.0)
+            area[(k <= j) | (area == 0)] = np.inf
+            area = area.ravel()
+
+            # The last restart in this block is at the first copy of its
+            # minimum; ties before it would have been dropped
+            start = int(np.argmin(area))
+            if area[start] == np.inf:
+                continue
+            if area[start] < min_area:
+                min_area = float(area[start])
+                count = 0
+                kept = []
+            else:
+                start = 0
+            ties = start + np.flatnonzero(np.abs(area[start:] - min_area) < tol)
+            count += len(ties)
+            for t in ties[:max_kept - len(kept)].tolist():
+                a, b = divmod(t, k.shape[1])
+                kept.append((i, int(j[a, 0]), int(k[0, b])))
+
+    return float(min_area), count, kept
 
 # Plot the given triangle and all triangles with min area side by side
 def plot_given_and_min_area_triangles(points, given_triangle, min_area_triangles):
+    import matplotlib.pyplot as plt
+
     num_plots = 1 + len(min_area_triangles)
     fig, axs = plt.subplots(1, num_plots, figsize=(5 * num_plots, 5))
     if num_plots == 1:
@@ -70,33 +105,26 @@ def plot_given_and_min_area_triangles(points, given_triangle, min_area_triangles
 
 # Main script
 if __name__ == "__main__":
+    flags = pop_flags(sys.argv, '--no-plot', '--timing')
+    timer = PhaseTimer(T0)
+    timer.mark('startup')
     if len(sys.argv) < 3:
-        print("Usage: python q2.py <input_file> <output_file>")
+        print("Usage: python q2.py [--no-plot] [--timing] <input_file> <output_file>")
         sys.exit(1)
 
     # Read input files
     points_filename = sys.argv[1]
     triangle_filename = sys.argv[2]
 
-    points = read_points(points_filename, skip_first_line=True)
-    triangle_points = read_points(triangle_filename)
-
-    # Generate all triangles from the point set
-    triangles = brute_force_triangles(points)
+    coords = read_points(points_filename)
+    points = [Point(x, y) for x, y in coords.tolist()]
+    triangle_points = [Point(x, y) for x, y in read_points(triangle_filename).tolist()]
+    timer.mark('read')
 
     # Find all triangles with the smallest non-zero area
-    min_area = float('inf')
-    min_area_triangles = []
-
-    for triangle in triangles:
-        area = triangle_area(*triangle)
-        if area == 0:
-            continue
-        if area < min_area:
-            min_area = area
-            min_area_triangles = [triangle]
-        elif abs(area - min_area) < 1e-9:
-            min_area_triangles.append(triangle)
+    min_area, num_min, min_idx = min_area_triangles(coords)
+    min_triangles = [[points[a], points[b], points[c]] for a, b, c in min_idx]
+    timer.mark('verify')
 
     # Compute area of the given triangle
     given_area = triangle_area(*triangle_points)
@@ -104,7 +132,13 @@ if __name__ == "__main__":
     # Output triangle area info
     print(f"Area of the given triangle: {given_area}")
     print(f"Minimum triangle area: {min_area}")
-    print(f"Number of triangles with min area: {len(min_area_triangles)}")
+    print(f"Number of triangles with min area: {num_min}")
+
+    timer.mark('output')
 
     # Plot the given and min area triangles side by side
-    plot_given_and_min_area_triangles(points, triangle_points, min_area_triangles)
+    if '--no-plot' not in flags:
+        plot_given_and_min_area_triangles(points, triangle_points, min_triangles)
+        timer.mark('plot')
+    if '--timing' in flags:
+        timer.report()
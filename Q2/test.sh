@@ -1,10 +1,6 @@
-g++ q2.cpp
-for i in {8..9}
-do
-    echo "========================="
-    echo "Running test$i.txt"
-    echo "========================="
-    ./a.out < "test$i.txt" > "points$i.txt"
-    echo
-    python3 q2.py test$i.txt points$i.txt
-done
\ No newline at end of file
+#!/bin/bash
+# Runs q2.cpp on every test*.txt in one batch process, building the binary
+# once, and checks each triangle against the brute force in q2.py
+# ("match" in the JSON output). q2.py still plots a single result.
+cd "$(dirname "$0")"
+python3 ../batch.py --engine q2 --verify --pattern 'test*.txt' . "$@"
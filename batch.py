@@ -0,0 +1,174 @@
+import time
+T0 = time.perf_counter()
+import os
+import re
+import sys
+import json
+import fnmatch
+import argparse
+import multiprocessing as mp
+import numpy as np
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'Q1'))
+sys.path.insert(0, os.path.join(ROOT, 'Q2'))
+from common.pointio import read_points
+from common.cache import ResultCache
+
+# Batch runner for many point files in one long-lived process.
+#
+# Files are spread over a worker pool whose workers import the engine once
+# at start-up, the q2.cpp binary is built once up front, and every input
+# yields one JSON line with its result and read/compute times in ms, in
+# input order. A file that fails gives a record with status "error" instead
+# of stopping the batch.
+
+EXTENSIONS = ('.txt', '.npy', '.f64', '.bin', '.gz')
+
+# Q1 engines return the indices of the max collinear subset
+def _run_main(pts, ctx):
+    from main import find_max_collinear
+    return find_max_collinear(pts)[1]
+
+def _run_sweep(pts, ctx):
+    from pipeline import max_collinear
+    return max_collinear(pts)
+
+def _run_arrangement(pts, ctx):
+    from arrangement import max_collinear
+    return max_collinear(pts)
+
+def _run_sample(pts, ctx):
+    from sampling import sample_max_collinear
+    return sample_max_collinear(pts, seed=0)
+
+def _area(t):
+    (ax, ay), (bx, by), (cx, cy) = t
+    return abs((bx - ax) * (cy - ay) - (by - ay) * (cx - ax)) / 2
+
+# q2.cpp on the points, checked against the brute-force verifier in q2.py
+# with --verify (what Q2/test.sh used to do by eye)
+def _run_q2(pts, ctx):
+    from native import min_area_triangle
+    triangle = min_area_triangle(pts, ctx['kinetic'], ctx['cache'], ctx['binary'])
+    result = {'triangle': triangle.tolist(), 'area': _area(triangle.tolist())}
+    if ctx['verify']:
+        from q2 import min_area_triangles
+        min_area, count, _ = min_area_triangles(pts)
+        result.update(min_area=min_area, min_count=count,
+                      match=bool(np.isclose(result['area'], min_area, rtol=1e-6, atol=1e-9)))
+    return result
+
+ENGINES = {
+    'main': ('main', _run_main),
+    'sweep': ('pipeline', _run_sweep),
+    'arrangement': ('arrangement', _run_arrangement),
+    'sample': ('sampling', _run_sample),
+    'q2': ('native', _run_q2),
+}
+
+_ctx = None
+
+def _init(ctx):
+    global _ctx
+    _ctx = dict(ctx)
+    __import__(ENGINES[_ctx['engine']][0])  # warm import, once per worker
+    if _ctx['verify']:
+        __import__('q2')
+    if _ctx['cache'] is not None:
+        _ctx['cache'] = ResultCache(_ctx['cache'])
+
+def run_file(path):
+    record = {'file': path, 'engine': _ctx['engine']}
+    try:
+        t = time.perf_counter()
+        pts = read_points(path)
+        t1 = time.perf_counter()
+        engine, fn = _ctx['engine'], ENGINES[_ctx['engine']][1]
+        if engine == 'q2':
+            result = fn(pts, _ctx)  # native.py caches the triangle itself
+        else:
+            if _ctx['cache'] is None:
+                idx = fn(pts, _ctx)
+            else:
+                idx = _ctx['cache'].cached(pts, 'batch.' + engine,
+                                           lambda: {'indices': fn(pts, _ctx)})['indices']
+            idx = np.asarray(idx).tolist()
+            result = {'size': len(idx), 'indices': idx}
+        t2 = time.perf_counter()
+        record.update(status='ok', n=len(pts), read_ms=round((t1 - t) * 1000, 3),
+                      compute_ms=round((t2 - t1) * 1000, 3), **result)
+    except Exception as e:
+        record.update(status='error', error=f"{type(e).__name__}: {e}")
+    return record
+
+def _natural(path):
+    return [int(s) if s.isdigit() else s for s in re.split(r'(\d+)', path)]
+
+# Input files from paths, directories (matching pattern, or any point file
+# extension) and a manifest of paths relative to the manifest's directory
+def collect_inputs(paths, manifest=None, pattern=None):
+    files = []
+    for p in paths:
+        if os.path.isdir(p):
+            names = sorted(os.listdir(p), key=_natural)
+            files += [os.path.join(p, f) for f in names
+                      if (fnmatch.fnmatch(f, pattern) if pattern else f.endswith(EXTENSIONS))]
+        else:
+            files.append(p)
+    if manifest:
+        base = os.path.dirname(os.path.abspath(manifest))
+        with open(manifest) as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    files.append(os.path.join(base, line))
+    return files
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Run one engine over many point files.')
+    parser.add_argument('inputs', nargs='*', help='point files or directories')
+    parser.add_argument('--manifest', help='file listing one point file per line')
+    parser.add_argument('--pattern', help='file name glob for directories, e.g. "test*.txt"')
+    parser.add_argument('--engine', choices=list(ENGINES), default='main')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--out', help='JSON-lines output file (default stdout)')
+    parser.add_argument('--kinetic', action='store_true', help='q2: use the kinetic sweep')
+    parser.add_argument('--verify', action='store_true', help='q2: check against the brute force')
+    parser.add_argument('--cache', action='store_true', help='use the on-disk result cache')
+    args = parser.parse_args(argv)
+
+    files = collect_inputs(args.inputs, args.manifest, args.pattern)
+    if not files:
+        parser.error('no input files')
+
+    ctx = {'engine': args.engine, 'kinetic': args.kinetic, 'verify': args.verify,
+           'cache': ResultCache().path if args.cache else None, 'binary': None}
+    if args.engine == 'q2':
+        from native import build_binary
+        ctx['binary'] = build_binary()
+
+    workers = max(1, min(args.workers, len(files)))
+    pool = mp.Pool(workers, initializer=_init, initargs=(ctx,)) if workers > 1 else None
+    out = open(args.out, 'w') if args.out else sys.stdout
+    failed = 0
+    try:
+        if pool is None:
+            _init(ctx)
+            records = map(run_file, files)
+        else:
+            records = pool.imap(run_file, files, chunksize=max(1, len(files) // (workers * 8)))
+        for record in records:
+            failed += record['status'] != 'ok'
+            out.write(json.dumps(record) + '\n')
+            out.flush()
+    finally:
+        if pool is not None:
+            pool.terminate()
+        if out is not sys.stdout:
+            out.close()
+    print(f"{len(files)} files, {failed} failed, {time.perf_counter() - T0:.2f} s", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,63 @@
+import numpy as np
+
+# Synthetic workloads for both problems. Every generator takes the number of
+# points and a numpy Generator and returns an (n, 2) float64 array. The
+# integer-valued ones keep coordinates small enough for exact float math.
+
+def uniform(n, rng):
+    return rng.random((n, 2)) * 1000.0
+
+# Distinct cells of the smallest square integer grid that holds n points
+def grid(n, rng):
+    side = int(np.ceil(np.sqrt(n)))
+    cells = rng.choice(side * side, size=n, replace=False)
+    return np.column_stack((cells % side, cells // side)).astype(np.float64)
+
+# A few random integer lines carrying k points each (k = n // 10 by default,
+# at least 3), with the rest spread over a wide integer range
+def planted(n, rng, k=None, lines=3):
+    k = max(3, n // 10) if k is None else k
+    k = min(k, n // lines) if n >= 3 * lines else n
+    pts = []
+    for _ in range(min(lines, n // max(k, 1))):
+        x0, y0 = rng.integers(-1000, 1000, size=2)
+        dx, dy = rng.integers(1, 7), rng.integers(-6, 7)
+        t = rng.choice(10 * k, size=k, replace=False)
+        pts.append(np.column_stack((x0 + dx * t, y0 + dy * t)))
+    rest = n - sum(len(p) for p in pts)
+    pts.append(rng.integers(-10 ** 6, 10 ** 6, size=(rest, 2)))
+    pts = np.concatenate(pts).astype(np.float64)
+    return pts[rng.permutation(n)]
+
+# Near-degenerate data: small clusters of points on one line through the
+# cluster centre, half of them exactly on it and half off by about 1e-12.
+# The on-line points sit on a dyadic lattice (integer centre, slope q/4,
+# offsets t = m 2^-20 up to about 1e-3), so their coordinates are exact; the
+# others are moved by a nonzero multiple of 2^-42 in y.
+def clusters(n, rng, size=8):
+    centres = rng.integers(0, 1000, size=(-(-n // size), 2))
+    q = rng.integers(-8, 9, size=len(centres))
+    c = np.repeat(np.arange(len(centres)), size)[:n]
+    r = np.tile(np.arange(size), len(centres))[:n]
+    m = r * (1024 // size) + rng.integers(0, 1024 // size, size=n)  # distinct per cluster
+    pts = np.column_stack((centres[c, 0] + m * 2.0 ** -20, centres[c, 1] + q[c] * m * 2.0 ** -22))
+    off = rng.random(n) < 0.5
+    pts[off, 1] += rng.choice([-4, -3, -2, -1, 1, 2, 3, 4], size=off.sum()) * 2.0 ** -42
+    return pts
+
+# Points on the parabola y = x^2 at distinct integer x: convex position,
+# so no three are collinear (the general-position input for Q2)
+def convex(n, rng):
+    x = np.sort(rng.choice(max(4 * n, 16), size=n, replace=False)) - 2 * n
+    return np.column_stack((x, x * x)).astype(np.float64)
+
+GENERATORS = {
+    'uniform': uniform,
+    'grid': grid,
+    'planted': planted,
+    'clusters': clusters,
+    'convex': convex,
+}
+
+def generate(name, n, seed=0):
+    return GENERATORS[name](n, np.random.default_rng(seed))
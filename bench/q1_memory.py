@@ -0,0 +1,94 @@
+import os
+import sys
+import argparse
+import tracemalloc
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'Q1'))
+from generators import generate, planted
+from dual import dual_lines, bounding_box, clip_lines
+from q1 import SweepLine, build_segments, sweep, segment_intersection
+
+# Memory of the q1.py sweep structures, measured with tracemalloc.
+#
+# At --segments lines it reports the bytes per segment (the column storage),
+# per queued endpoint event, per tree node (all segments live at the middle
+# of the box) and per queued intersection event. It then runs a full sweep
+# over --segments lines and reports the peak and the memory still held at
+# the end per vertex. Uniform points would give Θ(n²) vertices, so all but
+# --off-line of the points lie on one line: their duals meet at one vertex,
+# and each off-line dual crosses the others, about off-line * n vertices.
+# --sweep-points adds a smaller full sweep of uniform points.
+
+def _measure(fn):
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current - base, peak - base
+
+def _segments(pts):
+    duals = dual_lines(pts)
+    segs, idx = clip_lines(duals, bounding_box(duals))
+    return segs, duals[idx], idx
+
+def _full_sweep(title, segments):
+    done, held, peak = _measure(lambda: sweep(segments))
+    v = len(done.intersections)
+    print(f"full sweep, {title}: {len(segments)} segments, {v} vertices")
+    print(f"  peak             {peak / 2 ** 20:8.2f} MiB, {peak / max(v, 1):.1f} B/vertex")
+    print(f"  held at the end  {held / 2 ** 20:8.2f} MiB, {held / max(v, 1):.1f} B/vertex")
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Memory of the q1.py sweep structures.')
+    parser.add_argument('--segments', type=int, default=10 ** 4)
+    parser.add_argument('--off-line', type=int, default=20)
+    parser.add_argument('--sweep-points', type=int, default=150)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    segs, lines, idx = _segments(generate('uniform', args.segments, args.seed))
+    segments, seg_bytes, _ = _measure(lambda: build_segments(segs, lines, idx))
+    n = len(segments)
+    sl, queue_bytes, _ = _measure(lambda: SweepLine(segments))
+
+    # Every segment spans the middle of the box, so all of them are live there
+    SweepLine.x = (segs[:, 0].max() + segs[:, 2].min()) / 2
+    _, tree_bytes, _ = _measure(lambda: [sl.tree.insert(i) for i in range(n)])
+
+    # Vertices of neighbouring segments, queued as intersection events
+    def vertices():
+        count = 0
+        i = sl.tree.root
+        while sl.tree.prev[i] >= 0:
+            i = sl.tree.prev[i]
+        while sl.tree.next[i] >= 0:
+            j = sl.tree.next[i]
+            p = segment_intersection(segments, i, j)
+            if p is not None:
+                sl.add_intersection_event(p, i, j)
+                count += 1
+            i = j
+        return count
+    count, event_bytes, _ = _measure(vertices)
+    SweepLine.x = -1e20
+
+    print(f"{n} segments")
+    print(f"  segment columns  {seg_bytes / n:8.1f} B/segment")
+    print(f"  endpoint events  {queue_bytes / n:8.1f} B/segment (two events and the tree arrays)")
+    print(f"  tree nodes       {tree_bytes / n:8.1f} B/segment")
+    print(f"  vertex events    {event_bytes / max(count, 1):8.1f} B/event ({count} queued)")
+
+    rng = np.random.default_rng(args.seed)
+    pts = planted(args.segments, rng, k=args.segments - args.off_line, lines=1)
+    _full_sweep(f"{args.off_line} points off one line", build_segments(*_segments(pts)))
+    if args.sweep_points:
+        pts = generate('uniform', args.sweep_points, args.seed)
+        _full_sweep("uniform", build_segments(*_segments(pts)))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,215 @@
+import os
+import sys
+import json
+import time
+import math
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, HERE)
+from generators import GENERATORS, generate
+from common.pointio import write_points
+
+# Scaling benchmark for the Q1 and Q2 engines.
+#
+# Every (engine, workload, n) case runs in a fresh process so its peak RSS is
+# its own; the Python engines time only the call itself (data generation and
+# imports excluded), the native binary is timed end to end including reading
+# its input. Results go to a JSON-lines file, one record per case, and a
+# log-log slope per engine and workload is printed at the end.
+
+SIZES = [10, 100, 1000, 10 ** 4, 10 ** 5, 10 ** 6]
+
+# Largest n each engine is run at by default, chosen so a full run stays in
+# minutes; --no-caps lifts them and --budget still stops runaway curves
+CAPS = {
+    'numpy': 10 ** 4,
+    'parallel': 10 ** 4,
+    'sample': 10 ** 6,
+    'dict': 1000,
+    'sweep': 300,
+    'arrangement': 1000,
+    'q2cpp': 3000,
+    'q2kinetic': 10 ** 4,
+    'verifier': 300,
+}
+
+def _run_numpy(pts):
+    from main import find_max_collinear
+    return len(find_max_collinear(pts)[0])
+
+def _run_parallel(pts):
+    from parallel import parallel_max_collinear
+    return len(parallel_max_collinear(pts)[1])
+
+def _run_sample(pts):
+    from sampling import sample_max_collinear
+    return len(sample_max_collinear(pts, seed=0))
+
+def _run_dict(pts):
+    from main import find_intersections_and_collinear
+    return len(find_intersections_and_collinear(pts)[0])
+
+def _run_sweep(pts):
+    from pipeline import max_collinear
+    return len(max_collinear(pts))
+
+def _run_arrangement(pts):
+    from arrangement import max_collinear
+    return len(max_collinear(pts))
+
+def _run_verifier(pts):
+    from q2 import min_area_triangles
+    return min_area_triangles(pts)[0]
+
+PY_ENGINES = {
+    'numpy': ('Q1', _run_numpy),
+    'parallel': ('Q1', _run_parallel),
+    'sample': ('Q1', _run_sample),
+    'dict': ('Q1', _run_dict),
+    'sweep': ('Q1', _run_sweep),
+    'arrangement': ('Q1', _run_arrangement),
+    'verifier': ('Q2', _run_verifier),
+}
+# Native engines: q2.cpp binary flags
+NATIVE_ENGINES = {
+    'q2cpp': [],
+    'q2kinetic': ['--kinetic'],
+}
+ENGINES = list(PY_ENGINES) + list(NATIVE_ENGINES)
+
+# Peak resident set of a running process in kB. VmHWM belongs to the current
+# program image, so unlike ru_maxrss it does not include the memory of the
+# interpreter that forked it.
+def peak_rss_kb(pid='self'):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+# Child side of a Python case: prints {"seconds": ..., "result": ..., "peak_rss_kb": ...}
+def run_case(engine, workload, n, seed):
+    subdir, fn = PY_ENGINES[engine]
+    sys.path.insert(0, os.path.join(ROOT, subdir))
+    pts = generate(workload, n, seed)
+    fn(pts[:3])  # warm up imports outside the timed call
+    t = time.perf_counter()
+    result = fn(pts)
+    seconds = time.perf_counter() - t
+    print(json.dumps({'seconds': seconds, 'result': result, 'peak_rss_kb': peak_rss_kb()}))
+
+def build_q2(workdir):
+    binary = os.path.join(workdir, 'q2')
+    subprocess.run(['g++', '-O2', '-o', binary, os.path.join(ROOT, 'Q2', 'q2.cpp')], check=True)
+    return binary
+
+# Runs cmd to completion and returns (returncode, stdout, seconds, peak RSS in
+# kB), with returncode None on timeout. The peak is sampled from /proc while the
+# child runs, so a child that exits within a couple of milliseconds may
+# report None.
+def _measure(cmd, stdin=None, timeout=None):
+    with tempfile.TemporaryFile() as out:
+        t = time.perf_counter()
+        proc = subprocess.Popen(cmd, stdin=stdin, stdout=out, stderr=subprocess.DEVNULL)
+        peak = None
+        timed_out = False
+        while proc.poll() is None:
+            hwm = peak_rss_kb(proc.pid)
+            if hwm is not None:
+                peak = max(peak or 0, hwm)
+            if timeout and time.perf_counter() - t > timeout:
+                proc.kill()
+                proc.wait()
+                timed_out = True
+                break
+            time.sleep(0.002)
+        seconds = time.perf_counter() - t
+        if timed_out:
+            return None, b'', seconds, peak
+        out.seek(0)
+        return proc.returncode, out.read(), seconds, peak
+
+def bench_one(engine, workload, n, seed, binary, workdir, timeout):
+    record = {'engine': engine, 'workload': workload, 'n': n, 'seed': seed}
+    if engine in NATIVE_ENGINES:
+        path = os.path.join(workdir, 'points.txt')
+        write_points(path, generate(workload, n, seed))
+        with open(path) as f:
+            code, out, seconds, rss = _measure([binary] + NATIVE_ENGINES[engine], stdin=f, timeout=timeout)
+        result = None
+    else:
+        cmd = [sys.executable, os.path.abspath(__file__), '--case', engine, workload, str(n), str(seed)]
+        code, out, seconds, rss = _measure(cmd, timeout=timeout)
+        if code == 0:
+            child = json.loads(out.decode().strip().splitlines()[-1])
+            seconds, result, rss = child['seconds'], child['result'], child['peak_rss_kb']
+    if code is None:
+        record.update(status='timeout', seconds=seconds)
+    elif code != 0:
+        record.update(status='error', returncode=code)
+    else:
+        record.update(status='ok', seconds=seconds, peak_rss_kb=rss, result=result)
+    return record
+
+# Least-squares slope of log(seconds) against log(n) over the ok records
+def scaling_exponent(records):
+    pts = [(math.log(r['n']), math.log(r['seconds'])) for r in records
+           if r['status'] == 'ok' and r['n'] >= 100 and r['seconds'] > 0]
+    if len(pts) < 2:
+        return None
+    mx = sum(p[0] for p in pts) / len(pts)
+    my = sum(p[1] for p in pts) / len(pts)
+    sxx = sum((p[0] - mx) ** 2 for p in pts)
+    return sum((p[0] - mx) * (p[1] - my) for p in pts) / sxx if sxx else None
+
+def main(argv):
+    if len(argv) == 5 and argv[0] == '--case':
+        run_case(argv[1], argv[2], int(argv[3]), int(argv[4]))
+        return
+
+    parser = argparse.ArgumentParser(description='Scaling benchmark for the Q1 and Q2 engines.')
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=ENGINES)
+    parser.add_argument('--workloads', nargs='+', choices=list(GENERATORS), default=list(GENERATORS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=SIZES)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-caps', action='store_true', help='ignore the per-engine size caps')
+    parser.add_argument('--budget', type=float, default=60.0,
+                        help='skip larger sizes once a case takes longer than this (seconds)')
+    parser.add_argument('--out', default=os.path.join(HERE, 'results.jsonl'))
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='bench_')
+    try:
+        binary = build_q2(workdir) if set(NATIVE_ENGINES) & set(args.engines) else None
+        with open(args.out, 'a') as out:
+            for engine in args.engines:
+                for workload in args.workloads:
+                    records = []
+                    for n in sorted(args.sizes):
+                        if not args.no_caps and n > CAPS[engine]:
+                            break
+                        r = bench_one(engine, workload, n, args.seed, binary, workdir, 10 * args.budget)
+                        records.append(r)
+                        out.write(json.dumps(r) + '\n')
+                        out.flush()
+                        print(f"{engine:11} {workload:9} n={n:<8} {r['status']:7} "
+                              f"{r.get('seconds', 0):10.4f}s {(r.get('peak_rss_kb') or 0) / 1024:8.1f} MB")
+                        if r['status'] != 'ok' or r['seconds'] > args.budget:
+                            break
+                    k = scaling_exponent(records)
+                    if k is not None:
+                        print(f"{engine:11} {workload:9} time ~ n^{k:.2f}")
+    finally:
+        shutil.rmtree(workdir)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
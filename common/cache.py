@@ -0,0 +1,113 @@
+import os
+import json
+import hashlib
+import tempfile
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # no flock on Windows; writes stay atomic, eviction unlocked
+    fcntl = None
+
+# Content-addressed on-disk cache for engine results.
+#
+# A key is the sha256 of the engine name, its version from ENGINE_VERSIONS,
+# its parameters and the point array
+# normalised to contiguous float64 with -0.0 folded into 0.0, so the same
+# points from a text, .npy or .gz file share one entry. Each entry is an .npz
+# of named arrays. Entries are written to a temporary file and renamed into
+# place, so readers never see a partial file and need no lock; writers take
+# an flock on the directory while they evict. A hit refreshes the entry's
+# mtime, and eviction removes the oldest entries until the total size is back
+# under max_bytes.
+
+DEFAULT_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'q8_programming')
+
+# Version of each cached engine, part of every key. Bump an engine's entry
+# whenever a change can alter its results (ties included), so entries from
+# the old code are no longer hit. Version 1 was the unversioned key.
+ENGINE_VERSIONS = {
+    'dual.clip_lines': '2',
+    'main.find_max_collinear': '2',
+    'pipeline.max_collinear': '2',
+    'q2.cpp': '2',
+    'batch.main': '2',
+    'batch.sweep': '2',
+    'batch.arrangement': '2',
+    'batch.sample': '2',
+}
+
+class ResultCache:
+    def __init__(self, path=None, max_bytes=256 << 20):
+        self.path = path or os.environ.get('Q8_CACHE_DIR') or DEFAULT_DIR
+        self.max_bytes = max_bytes
+        os.makedirs(self.path, exist_ok=True)
+
+    # Engines missing from ENGINE_VERSIONS raise KeyError
+    @staticmethod
+    def key(points, engine, **params):
+        pts = np.ascontiguousarray(points, dtype=np.float64).reshape(-1, 2) + 0.0
+        h = hashlib.sha256()
+        h.update(json.dumps([engine, ENGINE_VERSIONS[engine], params, pts.shape],
+                            sort_keys=True).encode())
+        h.update(pts.tobytes())
+        return h.hexdigest()
+
+    def _file(self, key):
+        return os.path.join(self.path, key + '.npz')
+
+    # Dict of the stored arrays, or None on a miss
+    def get(self, key):
+        path = self._file(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                result = {name: data[name] for name in data.files}
+            os.utime(path)
+        except (FileNotFoundError, OSError, ValueError):
+            return None  # missing, evicted meanwhile, or unreadable
+        return result
+
+    def put(self, key, **arrays):
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **arrays)
+            os.chmod(tmp, 0o644)  # mkstemp's 0600 would hide entries from other users
+            os.replace(tmp, self._file(key))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        self.evict()
+
+    # Removes least recently used entries until the cache fits in max_bytes
+    def evict(self):
+        with open(os.path.join(self.path, '.lock'), 'w') as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            entries = []
+            for e in os.scandir(self.path):
+                if e.name.endswith('.npz'):
+                    try:
+                        st = e.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, e.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+    # compute() returns a dict of arrays; it only runs on a miss
+    def cached(self, points, engine, compute, **params):
+        key = self.key(points, engine, **params)
+        result = self.get(key)
+        if result is None:
+            result = compute()
+            self.put(key, **result)
+        return result
@@ -0,0 +1,18 @@
+# Removes the given --flags from argv in place and returns those present,
+# so the scripts can keep their positional argument checks
+def pop_flags(argv, *names):
+    found = {name for name in names if name in argv}
+    argv[:] = [arg for arg in argv if arg not in names]
+    return found
+
+# Removes `name value` from argv in place and returns value, or default if
+# the option is absent
+def pop_option(argv, name, default=None, type=str):
+    if name not in argv:
+        return default
+    k = argv.index(name)
+    if k + 1 >= len(argv):
+        raise SystemExit(f"{name} needs a value")
+    value = argv[k + 1]
+    del argv[k:k + 2]
+    return type(value)
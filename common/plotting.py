@@ -0,0 +1,41 @@
+import numpy as np
+
+# Drawing helpers that keep the figures usable for large inputs. All lines go
+# into one LineCollection instead of one artist each, layers with many
+# elements are rasterised so the saved file does not carry every vertex,
+# dense point sets are shaded by density with hexbin, and the scripts drop
+# their per-point and per-segment labels past LABEL_LIMIT items.
+
+LABEL_LIMIT = 20       # labels and legends per item up to this many items
+RASTER_LIMIT = 2000    # rasterise a layer with more elements than this
+DENSITY_LIMIT = 20000  # hexbin instead of markers past this many points
+
+# n colours spread over tab10, as cm.get_cmap("tab10", n) used to give
+def palette(n):
+    from matplotlib import colormaps
+    n = max(n, 1)
+    return colormaps['tab10'].resampled(n)(np.arange(n))
+
+# Adds segments, an (m, 2, 2) array of endpoint pairs, as one collection and
+# widens the data limits to hold them. Past RASTER_LIMIT segments they are
+# drawn thin and without antialiasing, which is most of Agg's cost.
+def add_lines(ax, segments, colors, linewidth=1.5):
+    from matplotlib.collections import LineCollection
+    segments = np.asarray(segments, dtype=np.float64).reshape(-1, 2, 2)
+    many = len(segments) > RASTER_LIMIT
+    lines = LineCollection(segments, colors=colors, linewidths=min(linewidth, 0.3) if many else linewidth,
+                           antialiaseds=not many, rasterized=many)
+    ax.add_collection(lines)
+    ax.autoscale_view()
+    return lines
+
+# Adds an (m, 2) array of points as markers, or as log-scaled hexbin density
+# past DENSITY_LIMIT points
+def add_points(ax, xy, color='red', label=None):
+    xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+    if len(xy) > DENSITY_LIMIT:
+        return ax.hexbin(xy[:, 0], xy[:, 1], gridsize=200, bins='log', mincnt=1,
+                         cmap='Reds', label=label, rasterized=True)
+    many = len(xy) > RASTER_LIMIT
+    return ax.scatter(xy[:, 0], xy[:, 1], c=color, s=4 if many else 36, label=label,
+                      rasterized=many, zorder=2)
@@ -0,0 +1,94 @@
+import gzip
+import warnings
+import numpy as np
+
+# One point reader for every engine. All formats come back as a C-contiguous
+# float64 array of shape (n, 2):
+#   .npy        memory-mapped, no parse and no copy if already float64 (n, 2)
+#   .f64 / .bin raw little-endian float64 x y pairs, memory-mapped
+#   .gz         gzip text, decompressed and parsed in chunks
+#   anything else is text: an optional point count, then "x y" per point.
+# A text file with an odd number of tokens is taken to start with the count.
+
+CHUNK = 1 << 24
+
+def read_points(path):
+    if path.endswith('.npy'):
+        pts = np.load(path, mmap_mode='r')
+    elif path.endswith(('.f64', '.bin')):
+        pts = np.memmap(path, dtype='<f8', mode='r')
+    elif path.endswith('.gz'):
+        pts = _parse_gzip(path)
+    else:
+        with open(path, 'r') as f:
+            pts = _parse_text(f.read())
+    return np.ascontiguousarray(pts, dtype=np.float64).reshape(-1, 2)
+
+def write_points(path, pts):
+    pts = np.ascontiguousarray(pts, dtype=np.float64).reshape(-1, 2)
+    if path.endswith('.npy'):
+        np.save(path, pts)
+    elif path.endswith(('.f64', '.bin')):
+        pts.astype('<f8').tofile(path)
+    else:
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'wt') as f:
+            f.write(f"{len(pts)}\n")
+            np.savetxt(f, pts, fmt='%.17g')
+
+def _tokens(text):
+    # Vectorised parse; fromstring only warns on junk, so make that an error
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', DeprecationWarning)
+        try:
+            return np.fromstring(text, dtype=np.float64, sep=' ')
+        except (DeprecationWarning, ValueError):
+            return None
+
+def _parse_text(text):
+    vals = _tokens(text)
+    if vals is None:
+        return _parse_lines(text.splitlines())
+    return _points_from_tokens(vals)
+
+def _parse_gzip(path):
+    chunks, tail = [], ''
+    with gzip.open(path, 'rt') as f:
+        while True:
+            block = f.read(CHUNK)
+            if not block:
+                block, tail = tail, ''
+            else:
+                block = tail + block
+                cut = max(block.rfind(' '), block.rfind('\n')) + 1
+                block, tail = block[:cut], block[cut:]
+            vals = _tokens(block)
+            if vals is None:
+                break
+            chunks.append(vals)
+            if not block and not tail:
+                break
+    if vals is None:
+        with gzip.open(path, 'rt') as f:
+            return _parse_lines(f)
+    return _points_from_tokens(np.concatenate(chunks))
+
+def _points_from_tokens(vals):
+    if len(vals) % 2:
+        n = int(vals[0])
+        vals = vals[1:2 * n + 1]
+    return vals.reshape(-1, 2)
+
+# Slow path for files with stray text: keep every line that is exactly two
+# numbers and skip the rest, as main.py's reader used to
+def _parse_lines(lines):
+    pts = []
+    for i, line in enumerate(lines, 1):
+        parts = line.split()
+        if len(parts) != 2:
+            continue
+        try:
+            pts.append((float(parts[0]), float(parts[1])))
+        except ValueError:
+            print(f"Warning: Could not convert line {i} to float: {line.strip()}")
+    return np.array(pts, dtype=np.float64).reshape(-1, 2)
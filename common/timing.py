@@ -0,0 +1,23 @@
+import sys
+import time
+
+# Wall-clock phase timer for the command-line scripts. Each mark(name) closes
+# the phase that began at the previous mark, or at t0 for the first one, so a
+# script that takes t0 before its imports gets its start-up cost as a phase.
+class PhaseTimer:
+    def __init__(self, t0=None):
+        self.last = time.perf_counter() if t0 is None else t0
+        self.phases = {}
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases[name] = self.phases.get(name, 0.0) + (now - self.last)
+        self.last = now
+
+    def as_dict(self):
+        return {name: round(sec * 1000, 3) for name, sec in self.phases.items()}
+
+    def report(self, file=sys.stderr):
+        parts = [f"{name} {ms:.1f} ms" for name, ms in self.as_dict().items()]
+        total = sum(self.phases.values()) * 1000
+        print(f"timing: {', '.join(parts)} (total {total:.1f} ms)", file=file)
@@ -0,0 +1,249 @@
+import time
+T0 = time.perf_counter()
+import os
+import sys
+import json
+import queue
+import signal
+import socket
+import struct
+import tempfile
+import argparse
+import threading
+import socketserver
+import multiprocessing as mp
+from concurrent.futures import Future
+import numpy as np
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'Q1'))
+sys.path.insert(0, os.path.join(ROOT, 'Q2'))
+from common.pointio import read_points
+
+# Resident query service: keeps the engines imported and the q2.cpp binary
+# built, and answers queries over a Unix socket (or localhost TCP), so a
+# small query costs a round trip instead of an interpreter start-up.
+#
+# Protocol, all little-endian, any number of requests per connection:
+#   request   op (1 byte), n (uint32), then n "x y" float64 pairs
+#   response  kind (1 byte), m (uint32), then m values: b'q' int64,
+#             b'd' float64, or b'e' m bytes of UTF-8 error text
+# A request with more than the server's max points (MAX_POINTS by default)
+# gets an error frame and the connection is closed, since its body is never
+# read.
+# Ops: b'C' indices of the max collinear subset (main.py's engine), b'T' the
+# min-area triangle's corners as 3 x y pairs (q2.cpp, kinetic sweep).
+#
+# The engines hold the GIL, so small requests gain nothing from running side
+# by side: they go to one queue, and a single thread drains whatever has
+# piled up and answers it back to back in this process. Requests with more
+# than SMALL_LIMIT points go to a process pool instead, so one large query
+# does not hold up the small ones behind it.
+
+REQUEST = struct.Struct('<cI')
+RESPONSE = struct.Struct('<cI')
+SMALL_LIMIT = 2000  # points; larger requests go to the pool
+BATCH_LIMIT = 64    # small requests answered per pass of the batch thread
+MAX_POINTS = 10 ** 7  # points per request (160 MB of input); more is refused
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), 'q8_programming.sock')
+
+_binary = None
+
+def _collinear(pts):
+    from main import find_max_collinear
+    return np.asarray(find_max_collinear(pts)[1], dtype=np.int64)
+
+def _triangle(pts):
+    from native import min_area_triangle
+    return min_area_triangle(pts, kinetic=True, binary=_binary)
+
+OPS = {b'C': _collinear, b'T': _triangle}
+
+# Warm imports, once per process
+def _init(binary):
+    global _binary
+    _binary = binary
+    import main, native
+
+def _compute(op, pts):
+    return OPS[op](pts)
+
+# Sends small requests to the batch thread and large ones to the pool; each
+# request gets a Future for its answer
+class Dispatcher:
+    def __init__(self, workers, binary):
+        _init(binary)
+        self.jobs = queue.Queue()
+        self.pool = mp.Pool(workers, initializer=_init, initargs=(binary,)) if workers else None
+        threading.Thread(target=self._batches, daemon=True).start()
+
+    def submit(self, op, pts):
+        future = Future()
+        if op not in OPS:
+            future.set_exception(ValueError(f"unknown op {op!r}"))
+        elif len(pts) > SMALL_LIMIT and self.pool is not None:
+            self.pool.apply_async(_compute, (op, pts), callback=future.set_result,
+                                  error_callback=future.set_exception)
+        else:
+            self.jobs.put((op, pts, future))
+        return future
+
+    def _batches(self):
+        while True:
+            batch = [self.jobs.get()]
+            while len(batch) < BATCH_LIMIT:
+                try:
+                    batch.append(self.jobs.get_nowait())
+                except queue.Empty:
+                    break
+            for op, pts, future in batch:
+                try:
+                    future.set_result(_compute(op, pts))
+                except Exception as e:
+                    future.set_exception(e)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+
+# Exactly size bytes from sock, or None if it closes first
+def _recv(sock, size):
+    buf = bytearray(size)
+    view, got = memoryview(buf), 0
+    while got < size:
+        k = sock.recv_into(view[got:])
+        if not k:
+            return None
+        got += k
+    return buf
+
+def _error(text):
+    text = text.encode()
+    return RESPONSE.pack(b'e', len(text)) + text
+
+def _reply(future):
+    try:
+        values = np.asarray(future.result())
+    except Exception as e:
+        return _error(f"{type(e).__name__}: {e}")
+    kind = b'q' if values.dtype.kind in 'iub' else b'd'
+    values = values.astype('<i8' if kind == b'q' else '<f8').ravel()
+    return RESPONSE.pack(kind, len(values)) + values.tobytes()
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        while True:
+            head = _recv(self.request, REQUEST.size)
+            if head is None:
+                return
+            op, n = REQUEST.unpack(head)
+            if n > self.server.max_points:
+                self.request.sendall(_error(f"ValueError: {n} points, at most {self.server.max_points} per request"))
+                return
+            body = _recv(self.request, 16 * n)
+            if body is None:
+                return
+            pts = np.frombuffer(body, dtype='<f8').reshape(-1, 2)
+            self.request.sendall(_reply(self.server.dispatcher.submit(op, pts)))
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+# Serves until interrupted or terminated, on a Unix socket path or, given a
+# port, on localhost TCP
+def serve(path=DEFAULT_SOCKET, port=None, workers=None, max_points=MAX_POINTS):
+    from native import build_binary
+    dispatcher = Dispatcher(os.cpu_count() if workers is None else workers, build_binary())
+    if port is None:
+        if os.path.exists(path):
+            os.unlink(path)  # left over from a server that did not shut down
+        server, where = _UnixServer(path, _Handler), path
+    else:
+        server, where = _TCPServer(('127.0.0.1', port), _Handler), f"127.0.0.1:{port}"
+    server.dispatcher = dispatcher
+    server.max_points = max_points
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))  # after the pool forks
+    print(f"serving on {where} ({time.perf_counter() - T0:.2f} s start-up)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        dispatcher.close()
+        if port is None and os.path.exists(path):
+            os.unlink(path)
+
+# Connection to a running server; one request at a time
+class Client:
+    def __init__(self, path=DEFAULT_SOCKET, port=None):
+        if port is None:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(path)
+        else:
+            self.sock = socket.create_connection(('127.0.0.1', port))
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def query(self, op, points):
+        pts = np.ascontiguousarray(points, dtype='<f8').reshape(-1, 2)
+        self.sock.sendall(REQUEST.pack(op, len(pts)) + pts.tobytes())
+        head = _recv(self.sock, RESPONSE.size)
+        if head is None:
+            raise ConnectionError("server closed the connection")
+        kind, m = RESPONSE.unpack(head)
+        body = _recv(self.sock, m if kind == b'e' else 8 * m)
+        if kind == b'e':
+            raise RuntimeError(body.decode())
+        return np.frombuffer(body, dtype='<i8' if kind == b'q' else '<f8')
+
+    # Indices of the max collinear subset
+    def max_collinear(self, points):
+        return self.query(b'C', points)
+
+    # Corners of the min-area triangle as a (3, 2) array
+    def min_area_triangle(self, points):
+        return self.query(b'T', points).reshape(3, 2)
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Resident max-collinear / min-triangle service.')
+    parser.add_argument('files', nargs='*', help='with --query: point files to send')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help='Unix socket path')
+    parser.add_argument('--port', type=int, help='serve on localhost TCP instead')
+    parser.add_argument('--workers', type=int, help='pool size for large requests (default: CPUs, 0: none)')
+    parser.add_argument('--max-points', type=int, default=MAX_POINTS,
+                        help='largest request the server accepts, in points')
+    parser.add_argument('--query', choices=['collinear', 'triangle'],
+                        help='send the files to a running server, one JSON line each')
+    args = parser.parse_args(argv)
+
+    if args.query is None:
+        serve(args.socket, args.port, args.workers, args.max_points)
+        return 0
+    with Client(args.socket, args.port) as client:
+        for path in args.files:
+            pts = read_points(path)
+            t = time.perf_counter()
+            if args.query == 'collinear':
+                idx = client.max_collinear(pts).tolist()
+                result = {'size': len(idx), 'indices': idx}
+            else:
+                result = {'triangle': client.min_area_triangle(pts).tolist()}
+            ms = round((time.perf_counter() - t) * 1000, 3)
+            print(json.dumps({'file': path, 'n': len(pts), 'ms': ms, **result}))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))